@@ -1,23 +1,167 @@
 // Auto Face Tracker
+// Blocking text commands, one per line, answered with "OK" once the move is done:
+//   L123 / R123          pan only
+//   M<pan>,<tilt>,<spd>  both axes, signed steps, speed in steps/s (0 = default)
+//   S                    stop (decelerates a streaming move)
+// Binary packets start with 0xA5: seq, pan (int16), tilt (int16), speed (uint16),
+// little endian, then the xor of all previous bytes. Speed 0 means stop (like S).
+// Answered with 0x5A, seq, status (0 ok, 1 bad checksum) once the move is done.
+// Streaming commands, answered with "OK" at once; the axes keep running from
+// loop() with trapezoidal acceleration and can be retargeted mid-move:
+//   D<pan>,<tilt>  target = current position + delta
+//   T<pan>,<tilt>  absolute target
+//   V<pan>,<tilt>  run at a constant velocity (steps/s)
+//   H              decelerate to a stop
+//   P              reply P<pan>,<tilt> with the current position
 const int STEP_PIN=2, DIR_PIN=3, EN_PIN=4;
+const int TILT_STEP_PIN=5, TILT_DIR_PIN=6;
+const byte PACKET_SYNC=0xA5, ACK_SYNC=0x5A, ACK_OK=0, ACK_BAD_CHECKSUM=1;
+const int PACKET_SIZE=9;
+const unsigned int DEFAULT_SPEED=500;
+const float MAX_SPEED=2000, ACCEL=8000;
+
+struct Axis{
+  int stepPin, dirPin;
+  long pos, target;
+  float v, frac, jogSpeed;
+  bool jog;
+};
+Axis axes[2]={{STEP_PIN,DIR_PIN,0,0,0,0,0,false},{TILT_STEP_PIN,TILT_DIR_PIN,0,0,0,0,0,false}};
+char line[32];
+byte lineLen=0;
+unsigned long lastRun=0;
+
 void setup(){
   Serial.begin(115200);
   pinMode(STEP_PIN,OUTPUT);pinMode(DIR_PIN,OUTPUT);pinMode(EN_PIN,OUTPUT);
+  pinMode(TILT_STEP_PIN,OUTPUT);pinMode(TILT_DIR_PIN,OUTPUT);
   digitalWrite(EN_PIN,LOW);
+  lastRun=micros();
   Serial.println("READY");
 }
-void loop(){
-  if(Serial.available()){
-    String cmd=Serial.readStringUntil('\n');
-    char dir=cmd.charAt(0);
-    int steps=cmd.substring(1).toInt();
-    if(dir=='L'||dir=='R'){
-      digitalWrite(DIR_PIN,dir=='R');
-      for(int i=0;i<steps;i++){
-        digitalWrite(STEP_PIN,HIGH);delayMicroseconds(1000);
-        digitalWrite(STEP_PIN,LOW);delayMicroseconds(1000);
-      }
-      Serial.println("OK");
+
+// blocking move: both axes step together, the shorter move spread over the longer one
+void move(long pan, long tilt, unsigned int speed){
+  if(speed==0) return;
+  digitalWrite(DIR_PIN,pan>0);
+  digitalWrite(TILT_DIR_PIN,tilt>0);
+  long a=labs(pan), b=labs(tilt), n=max(a,b);
+  unsigned long half=min(500000UL/speed,16000UL);
+  long ea=0, eb=0;
+  for(long i=0;i<n;i++){
+    ea+=a; eb+=b;
+    if(ea>=n){ea-=n;digitalWrite(STEP_PIN,HIGH);}
+    if(eb>=n){eb-=n;digitalWrite(TILT_STEP_PIN,HIGH);}
+    delayMicroseconds(half);
+    digitalWrite(STEP_PIN,LOW);digitalWrite(TILT_STEP_PIN,LOW);
+    delayMicroseconds(half);
+  }
+  axes[0].pos+=pan; axes[0].target=axes[0].pos;
+  axes[1].pos+=tilt; axes[1].target=axes[1].pos;
+}
+
+void pulse(Axis &a, int dir){
+  digitalWrite(a.dirPin,dir>0);
+  digitalWrite(a.stepPin,HIGH);
+  delayMicroseconds(2);
+  digitalWrite(a.stepPin,LOW);
+  a.pos+=dir;
+}
+
+// one scheduler tick: push the speed towards the profile, emit at most one step
+void runAxis(Axis &a, float dt){
+  float desired;
+  if(a.jog) desired=a.jogSpeed;
+  else{
+    long d=a.target-a.pos;
+    if(d==0&&fabs(a.v)<=ACCEL*dt){a.v=0;a.frac=0;return;}
+    desired=min(MAX_SPEED,(float)sqrt(2.0*ACCEL*labs(d)));
+    if(d<0) desired=-desired;
+  }
+  float dv=constrain(desired-a.v,-ACCEL*dt,ACCEL*dt);
+  a.v+=dv;
+  a.frac+=a.v*dt;
+  if(a.frac>=1){a.frac-=1;pulse(a,1);}
+  else if(a.frac<=-1){a.frac+=1;pulse(a,-1);}
+  // a slow loop can't step as fast as the profile asks; drop the excess
+  // instead of banking it, or the axis keeps running after v reaches 0
+  a.frac=constrain(a.frac,-1,1);
+}
+
+void setTarget(Axis &a, long target){a.target=target;a.jog=false;}
+
+void halt(Axis &a){
+  long stop=(long)(a.v*a.v/(2*ACCEL));
+  setTarget(a,a.v>0?a.pos+stop:a.pos-stop);
+}
+
+void readPacket(){
+  byte buf[PACKET_SIZE];
+  Serial.readBytes(buf,PACKET_SIZE);
+  byte c=0;
+  for(int i=0;i<PACKET_SIZE-1;i++) c^=buf[i];
+  byte ack[3]={ACK_SYNC,buf[1],ACK_OK};
+  if(c!=buf[PACKET_SIZE-1]){
+    ack[2]=ACK_BAD_CHECKSUM;
+    Serial.write(ack,3);
+    return;
+  }
+  int16_t pan=(int16_t)(buf[2]|(buf[3]<<8));
+  int16_t tilt=(int16_t)(buf[4]|(buf[5]<<8));
+  uint16_t speed=buf[6]|(buf[7]<<8);
+  if(speed==0){halt(axes[0]);halt(axes[1]);}
+  else move(pan,tilt,speed);
+  Serial.write(ack,3);
+}
+
+void handleLine(){
+  char c=line[0];
+  long a=0, b=0, speed=0;
+  char *p=line+1;
+  a=strtol(p,&p,10);
+  if(*p==',') b=strtol(p+1,&p,10);
+  if(*p==',') speed=strtol(p+1,&p,10);
+  if(c=='L'||c=='R'){move(c=='R'?a:-a,0,DEFAULT_SPEED);}
+  else if(c=='M'){move(a,b,speed>0?speed:DEFAULT_SPEED);}
+  else if(c=='D'){setTarget(axes[0],axes[0].pos+a);setTarget(axes[1],axes[1].pos+b);}
+  else if(c=='T'){setTarget(axes[0],a);setTarget(axes[1],b);}
+  else if(c=='V'){
+    axes[0].jog=axes[1].jog=true;
+    axes[0].jogSpeed=constrain(a,-MAX_SPEED,MAX_SPEED);
+    axes[1].jogSpeed=constrain(b,-MAX_SPEED,MAX_SPEED);
+  }
+  else if(c=='H'||c=='S'){halt(axes[0]);halt(axes[1]);}
+  else if(c=='P'){
+    Serial.print('P');Serial.print(axes[0].pos);Serial.print(',');Serial.println(axes[1].pos);
+    return;
+  }
+  else return;
+  Serial.println("OK");
+}
+
+// reads whatever has arrived without waiting for the rest of a line
+void pollSerial(){
+  while(Serial.available()){
+    if(lineLen==0&&Serial.peek()==PACKET_SYNC){
+      if(Serial.available()<PACKET_SIZE) return;
+      readPacket();
+      continue;
     }
+    char ch=Serial.read();
+    if(ch=='\r') continue;
+    if(ch=='\n'){
+      line[lineLen]=0;
+      if(lineLen) handleLine();
+      lineLen=0;
+    }else if(lineLen<sizeof(line)-1) line[lineLen++]=ch;
   }
 }
+
+void loop(){
+  pollSerial();
+  unsigned long now=micros();
+  float dt=min((now-lastRun)*1e-6,0.01);
+  lastRun=now;
+  runAxis(axes[0],dt);
+  runAxis(axes[1],dt);
+}
@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+MODES={
+    "full":{},
+    "track":{"detect_interval":5},
+    "roi":{"roi_margin":0.5},
+    "downscale":{"scale":0.5},
+}
+RESOLUTIONS=["640x480","1280x720"]
+
+def percentile(values, q):
+    if not values: return 0.0
+    s=sorted(values)
+    return s[min(len(s)-1, int(q*len(s)))]
+
+def run_case(mode, res, frames, warmup, video, pipelined, source_fps=None):
+    # runs in a fresh process so peak RSS belongs to this case alone. Rates
+    # are measured from the actuation of frame `warmup` on, so startup
+    # (camera, MediaPipe graph) and warmup frames are left out
+    from src.config import Config
+    from src.face_tracker import FaceTracker
+    from src.frame_source import SyntheticSource, VideoFileSource
+    from src.simulator import Simulator
+    w,h=map(int, res.split("x"))
+    Config.FRAME_WIDTH,Config.FRAME_HEIGHT=w,h
+    latencies=[]
+    mark={}
+    class BenchTracker(FaceTracker):
+        def actuate(self, faces, ts=None):
+            super().actuate(faces, ts)
+            if ts is None: return
+            now=time.monotonic()
+            latencies.append((now-ts)*1000)
+            if len(latencies)==warmup+1: mark.update(t=now, cpu=time.process_time())
+            mark["end"]=now
+    source=VideoFileSource(video, w, h) if video else SyntheticSource(w, h, fps=source_fps)
+    tracker=BenchTracker(sim=True, pipelined=pipelined, camera=source, comm=Simulator(0, verbose=False),
+                         display=False, max_frames=frames+warmup, **MODES[mode])
+    tracker.start()
+    cpu=time.process_time()-mark["cpu"]
+    wall=mark["end"]-mark["t"]
+    lat=latencies[warmup:]
+    n=len(lat)-1
+    return {"mode":mode, "resolution":res, "pipelined":pipelined, "frames":len(lat),
+            "fps":round(n/wall,2) if wall>0 else 0.0, "cpu_s":round(cpu,3), "cpu_per_frame_ms":round(cpu/max(n,1)*1000,3),
+            "p50_ms":round(percentile(lat,0.5),3), "p95_ms":round(percentile(lat,0.95),3), "p99_ms":round(percentile(lat,0.99),3),
+            "peak_rss_mb":round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024,1),
+            "commands":tracker.stats["commands"]}
+
+def git_rev():
+    try: return subprocess.check_output(["git","rev-parse","--short","HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError): return "unknown"
+
+def compare(results, baseline, tolerance):
+    # fail when a case loses more than `tolerance` of its baseline fps
+    base={(c["mode"],c["resolution"],c["pipelined"]):c for c in baseline["cases"]}
+    failed=False
+    for c in results["cases"]:
+        b=base.get((c["mode"],c["resolution"],c["pipelined"]))
+        if not b: continue
+        delta=(c["fps"]-b["fps"])/b["fps"] if b["fps"] else 0.0
+        flag="REGRESSION" if delta<-tolerance else ""
+        failed|=bool(flag)
+        print(f"{c['mode']:>10} {c['resolution']:>9} fps {b['fps']:>8} -> {c['fps']:>8} ({delta:+.1%}) "
+              f"p95 {b['p95_ms']} -> {c['p95_ms']} ms {flag}")
+    return failed
+
+def main():
+    p=argparse.ArgumentParser(description="Headless FaceTracker benchmark")
+    p.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    p.add_argument("--resolutions", nargs="+", default=RESOLUTIONS)
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--warmup", type=int, default=30)
+    p.add_argument("--video", help="recorded video to use instead of synthetic frames")
+    p.add_argument("--pipeline", action="store_true")
+    p.add_argument("--source-fps", type=float, default=120.0,
+                   help="pace synthetic frames (0 = as fast as possible); caps the measured fps")
+    p.add_argument("--out", help="results file (default benchmarks/results/<rev>.json)")
+    p.add_argument("--compare", help="baseline results file to compare against")
+    p.add_argument("--tolerance", type=float, default=0.1)
+    args=p.parse_args()
+    rev=git_rev()
+    results={"rev":rev, "python":platform.python_version(), "machine":platform.machine(),
+             "cpus":os.cpu_count(), "frames":args.frames, "source":args.video or "synthetic",
+             "source_fps":None if args.video else args.source_fps or None, "cases":[]}
+    for mode in args.modes:
+        for res in args.resolutions:
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as ex:
+                case=ex.submit(run_case, mode, res, args.frames, args.warmup, args.video, args.pipeline,
+                                 args.source_fps or None).result()
+            print(json.dumps(case))
+            results["cases"].append(case)
+    out=args.out or os.path.join(os.path.dirname(__file__), "results", f"{rev}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out,"w") as f: json.dump(results, f, indent=2)
+    print(f"wrote {out}")
+    if args.compare:
+        with open(args.compare) as f: baseline=json.load(f)
+        if baseline.get("source_fps")!=results["source_fps"]:
+            print(f"warning: baseline source fps {baseline.get('source_fps')} differs from {results['source_fps']}")
+        if compare(results, baseline, args.tolerance): sys.exit(1)
+
+if __name__=="__main__": main()
@@ -1,19 +1,42 @@
 import cv2
 from src.exceptions import CameraException
+from src.logger import setup_logger
+from src.metrics import metrics
+
+log=setup_logger(__name__)
 
 class Camera:
-    def __init__(self, idx=0, w=640, h=480):
+    # idx is a device index or a path like /dev/video2; backend "v4l2" forces
+    # the V4L2 backend. fourcc ("MJPG", "YUYV"), fps and buffer_size are asked
+    # of the driver before capture starts, and w/h become the size it actually
+    # delivers. buffer_size=1 keeps the driver from queueing stale frames.
+    # read(out) decodes into `out` when it has the right shape
+    def __init__(self, idx=0, w=640, h=480, fourcc=None, fps=None, buffer_size=1, backend=None):
+        if fourcc and len(fourcc)!=4: raise ValueError(f"fourcc must be 4 characters, got {fourcc!r}")
         self.idx=idx
         self.w=w
         self.h=h
+        self.fourcc=fourcc
+        self.fps=fps
+        self.buffer_size=buffer_size
+        self.backend=backend
         self.cap=None
     def open(self):
-        self.cap=cv2.VideoCapture(self.idx)
+        self.cap=cv2.VideoCapture(self.idx, cv2.CAP_V4L2 if self.backend=="v4l2" else cv2.CAP_ANY)
         if not self.cap.isOpened(): raise CameraException("Cannot open")
+        # the pixel format has to be chosen before the size on V4L2
+        if self.fourcc: self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.w)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.h)
-    def read(self):
-        ret,frame=self.cap.read()
+        if self.fps: self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        if self.buffer_size: self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        self.w=int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or self.w
+        self.h=int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or self.h
+        code=int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        log.info("camera %s: %dx%d %s %.0f fps", self.idx, self.w, self.h,
+                 "".join(chr((code>>8*i)&0xFF) for i in range(4)) if code else "?", self.cap.get(cv2.CAP_PROP_FPS))
+    def read(self, out=None):
+        with metrics.timer("camera_read"): ret,frame=self.cap.read(out)
         if not ret: raise CameraException("Read failed")
         return frame
     def release(self):
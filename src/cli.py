@@ -1,12 +1,72 @@
 import argparse
+import logging
+import signal
+import yaml
+from src.config import Config, ConfigWatcher, attr_name, load
 from src.face_tracker import FaceTracker
+from src.metrics import MetricsReporter, metrics
+from src.recorder import AsyncRecorder
+
+# flags that override a Config attribute when given
+OVERRIDES={"serial_mode":"SERIAL_MODE", "detect_interval":"DETECT_INTERVAL", "roi_margin":"ROI_MARGIN",
+           "detect_scale":"DETECT_SCALE", "control":"CONTROL", "predict":"PREDICT", "display_every":"DISPLAY_EVERY",
+           "segment_seconds":"SEGMENT_SECONDS", "target":"TARGET_POLICY", "tilt":"TILT", "protocol":"SERIAL_PROTOCOL",
+           "source":"CAMERA_SOURCE", "fourcc":"CAMERA_FOURCC"}
+
+def parse_set(item):
+    key,sep,value=item.partition("=")
+    if not sep: raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {item!r}")
+    try: return attr_name(key.strip()), value
+    except ValueError as e: raise argparse.ArgumentTypeError(str(e))
 
 def main():
     p=argparse.ArgumentParser()
     p.add_argument("--port")
     p.add_argument("--simulate", action="store_true")
+    p.add_argument("--config", default="config.yml", help="YAML config; TRACKER_<KEY> environment variables and flags override it")
+    p.add_argument("--set", type=parse_set, action="append", default=[], metavar="KEY=VALUE",
+                   help="override any config key, e.g. pid.kp=4 or DEAD_ZONE=30")
+    p.add_argument("--no-reload", action="store_true", help="do not watch the config file for changes")
+    p.add_argument("--source", help="camera index, /dev/videoN, a video file, a directory of images or 'synthetic'")
+    p.add_argument("--fourcc", choices=["MJPG","YUYV"], help="camera pixel format")
+    p.add_argument("--pipeline", action="store_true", help="run capture, detection and actuation on separate threads")
+    p.add_argument("--serial-mode", choices=["sync","async","stream"],
+                   help="async queues commands and never waits for the motor; stream retargets the non-blocking sketch mid-move")
+    p.add_argument("--detect-interval", type=int, help="run the full detector every N frames and track in between")
+    p.add_argument("--roi-margin", type=float, help="detect in a window this much larger than the last face before trying the full frame")
+    p.add_argument("--detect-scale", type=float, help="downscale factor for full-frame detection")
+    p.add_argument("--control", choices=["step","pid"], help="pid drives the motor from the offset and frame dt")
+    p.add_argument("--predict", action="store_true", default=None, help="aim at the face position predicted for actuation time")
+    p.add_argument("--web-port", type=int, help="serve the web app and /metrics from the tracker process")
+    p.add_argument("--metrics-interval", type=float, help="log a timing summary every N seconds")
+    p.add_argument("--headless", action="store_true", help="no preview window; stop with SIGINT/SIGTERM")
+    p.add_argument("--display-every", type=int, help="show only every Nth frame")
+    p.add_argument("--record", metavar="PATH", help="record to PATH_<timestamp>.avi segments on a background thread")
+    p.add_argument("--record-event", action="store_true", help="only record while a face is present, with pre-roll")
+    p.add_argument("--segment-seconds", type=float)
+    p.add_argument("--target", choices=["largest","central","confidence","sticky"], help="lock onto one face when several are visible")
+    p.add_argument("--tilt", action="store_true", default=None, help="drive the tilt axis too (needs the two-axis sketch)")
+    p.add_argument("--protocol", choices=["text","binary"], help="serial command format")
     args=p.parse_args()
     if not args.simulate and not args.port: p.error("--port required")
-    FaceTracker(args.port, args.simulate).start()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    overrides=dict(args.set)
+    overrides.update({attr:getattr(args, flag) for flag,attr in OVERRIDES.items() if getattr(args, flag) is not None})
+    try: load(args.config, overrides=overrides)
+    except (OSError, ValueError, yaml.YAMLError) as e: p.error(f"config: {e}")
+    if args.web_port:
+        from src.web.app import serve_in_background
+        serve_in_background(port=args.web_port)
+    if args.metrics_interval: MetricsReporter(metrics, args.metrics_interval).start()
+    recorder=None
+    if args.record:
+        recorder=AsyncRecorder(args.record, Config.RECORD_FPS, (Config.FRAME_WIDTH, Config.FRAME_HEIGHT), Config.RECORD_BUFFER,
+                               Config.SEGMENT_SECONDS, Config.SEGMENT_BYTES, args.record_event, Config.PREROLL, Config.POSTROLL)
+    tracker=FaceTracker(args.port, args.simulate, pipelined=args.pipeline, display=not args.headless, recorder=recorder)
+    watcher=None if args.no_reload else ConfigWatcher(args.config, tracker.apply_config, overrides=overrides).start()
+    for sig in (signal.SIGINT, signal.SIGTERM): signal.signal(sig, tracker.request_stop)
+    try: tracker.start()
+    finally:
+        if watcher: watcher.stop()
 
 if __name__=="__main__": main()
@@ -1,6 +1,203 @@
+import os
+import threading
+import yaml
+from src.logger import setup_logger
+
+log=setup_logger(__name__)
+
 class Config:
     CAMERA_INDEX=0
     FRAME_WIDTH=640
     FRAME_HEIGHT=480
+    CAMERA_SOURCE=None
+    CAMERA_FOURCC=None
+    CAMERA_FPS=None
+    CAMERA_BUFFER=1
+    CAMERA_BACKEND=None
+    FRAME_POOL=8
     DEAD_ZONE=50
     BAUD_RATE=115200
+    STATS_INTERVAL=5.0
+    SERIAL_MODE="sync"
+    STEP_DELAY=0.002
+    COALESCING="latest"
+    DETECT_INTERVAL=1
+    REDETECT_THRESHOLD=0.6
+    MIN_CONFIDENCE=0.5
+    MODEL_SELECTION=0
+    ROI_MARGIN=None
+    DETECT_SCALE=1.0
+    CONTROL="step"
+    MAX_STEPS=200
+    STEP_MULTIPLIER=0.5
+    PX_PER_STEP=1.0
+    PID_KP=6.0
+    PID_KI=0.5
+    PID_KD=0.1
+    PID_OUT_LIMIT=3000.0
+    PID_D_ALPHA=0.5
+    PID_RATE_LIMIT=30000.0
+    PREDICT=False
+    KALMAN_ACCEL_NOISE=2000.0
+    KALMAN_MEAS_NOISE=16.0
+    KALMAN_MAX_COAST=5
+    MAX_LEAD=0.5
+    DISPLAY_EVERY=1
+    DISPLAY_FPS=30.0
+    RECORD_FPS=30.0
+    RECORD_BUFFER=60
+    SEGMENT_SECONDS=300.0
+    SEGMENT_BYTES=None
+    PREROLL=2.0
+    POSTROLL=2.0
+    TARGET_POLICY=None
+    TARGET_SWITCH_MARGIN=1.5
+    TILT=False
+    SERIAL_PROTOCOL="text"
+    MOTOR_SPEED=500
+    MAX_SPEED=2000.0
+    ACCEL=8000.0
+
+# config.yml "section.key" -> Config attribute
+KEYS={
+    "camera.index":"CAMERA_INDEX", "camera.width":"FRAME_WIDTH", "camera.height":"FRAME_HEIGHT",
+    "camera.source":"CAMERA_SOURCE", "camera.fourcc":"CAMERA_FOURCC", "camera.fps":"CAMERA_FPS",
+    "camera.buffer_size":"CAMERA_BUFFER", "camera.backend":"CAMERA_BACKEND", "camera.frame_pool":"FRAME_POOL",
+    "detector.confidence":"MIN_CONFIDENCE", "detector.model":"MODEL_SELECTION", "detector.interval":"DETECT_INTERVAL",
+    "detector.redetect_threshold":"REDETECT_THRESHOLD", "detector.roi_margin":"ROI_MARGIN", "detector.scale":"DETECT_SCALE",
+    "tracking.dead_zone":"DEAD_ZONE", "tracking.max_steps":"MAX_STEPS", "tracking.step_multiplier":"STEP_MULTIPLIER",
+    "tracking.px_per_step":"PX_PER_STEP",
+    "tracking.control":"CONTROL", "tracking.tilt":"TILT", "tracking.target":"TARGET_POLICY",
+    "tracking.switch_margin":"TARGET_SWITCH_MARGIN",
+    "pid.kp":"PID_KP", "pid.ki":"PID_KI", "pid.kd":"PID_KD", "pid.out_limit":"PID_OUT_LIMIT",
+    "pid.d_alpha":"PID_D_ALPHA", "pid.rate_limit":"PID_RATE_LIMIT",
+    "prediction.enabled":"PREDICT", "prediction.accel_noise":"KALMAN_ACCEL_NOISE", "prediction.meas_noise":"KALMAN_MEAS_NOISE",
+    "prediction.max_coast":"KALMAN_MAX_COAST", "prediction.max_lead":"MAX_LEAD",
+    "serial.baudrate":"BAUD_RATE", "serial.mode":"SERIAL_MODE", "serial.protocol":"SERIAL_PROTOCOL",
+    "serial.coalescing":"COALESCING", "serial.motor_speed":"MOTOR_SPEED", "serial.max_speed":"MAX_SPEED",
+    "serial.accel":"ACCEL", "serial.step_delay":"STEP_DELAY",
+    "display.every":"DISPLAY_EVERY", "display.fps":"DISPLAY_FPS",
+    "recording.fps":"RECORD_FPS", "recording.buffer":"RECORD_BUFFER", "recording.segment_seconds":"SEGMENT_SECONDS",
+    "recording.segment_bytes":"SEGMENT_BYTES", "recording.preroll":"PREROLL", "recording.postroll":"POSTROLL",
+    "runtime.stats_interval":"STATS_INTERVAL",
+}
+# applied to a running tracker; everything else is stored but needs a restart
+LIVE={"DEAD_ZONE","MAX_STEPS","STEP_MULTIPLIER","PX_PER_STEP","PID_KP","PID_KI","PID_KD","PID_OUT_LIMIT","PID_D_ALPHA",
+      "PID_RATE_LIMIT","KALMAN_MAX_COAST","MAX_LEAD","DETECT_INTERVAL","REDETECT_THRESHOLD","ROI_MARGIN",
+      "DETECT_SCALE","TARGET_SWITCH_MARGIN","COALESCING","DISPLAY_EVERY","DISPLAY_FPS","STATS_INTERVAL"}
+# allowed values for keys that select a mode
+CHOICES={"SERIAL_MODE":("sync","async","stream"), "CONTROL":("step","pid"), "COALESCING":("net","latest"),
+         "SERIAL_PROTOCOL":("text","binary"), "TARGET_POLICY":(None,"largest","central","confidence","sticky"),
+         "CAMERA_FOURCC":(None,"MJPG","YUYV"), "CAMERA_BACKEND":(None,"v4l2"), "MODEL_SELECTION":(0,1)}
+# numbers that default to None (off / driver default)
+NULLABLE_NUMBERS={"ROI_MARGIN","SEGMENT_BYTES","CAMERA_FPS"}
+ENV_PREFIX="TRACKER_"
+DEFAULTS={k:v for k,v in vars(Config).items() if k.isupper()}
+
+def attr_name(key):
+    # accepts "pid.kp", "PID_KP" or "pid_kp"
+    attr=KEYS.get(key, key.upper())
+    if attr not in DEFAULTS: raise ValueError(f"unknown config key {key!r}")
+    return attr
+
+def coerce(attr, value):
+    value=_coerce_type(attr, value)
+    if attr in CHOICES and value not in CHOICES[attr]:
+        raise ValueError(f"{attr} must be one of {', '.join(map(str, CHOICES[attr]))}, got {value!r}")
+    return value
+
+def _coerce_type(attr, value):
+    # strings (environment, --set) are parsed like YAML scalars, then checked against the default's type
+    if isinstance(value, str): value=yaml.safe_load(value) if value.strip() else None
+    default=DEFAULTS[attr]
+    if value is None: return value
+    if attr in NULLABLE_NUMBERS:
+        if isinstance(value, bool) or not isinstance(value, (int, float)): raise ValueError(f"{attr} expects a number, got {value!r}")
+        return value
+    if default is None: return value
+    if isinstance(default, bool):
+        if not isinstance(value, bool): raise ValueError(f"{attr} expects true/false, got {value!r}")
+        return value
+    if isinstance(default, (int, float)):
+        if isinstance(value, bool) or not isinstance(value, (int, float)): raise ValueError(f"{attr} expects a number, got {value!r}")
+        if isinstance(default, int) and value!=int(value): raise ValueError(f"{attr} expects an integer, got {value!r}")
+        return type(default)(value)
+    return str(value)
+
+def read_yaml(path):
+    if not path or not os.path.exists(path): return {}
+    with open(path) as f: data=yaml.safe_load(f) or {}
+    values={}
+    for section,entries in data.items():
+        if not isinstance(entries, dict): raise ValueError(f"config section {section!r} must be a mapping")
+        for key,value in entries.items(): values[attr_name(f"{section}.{key}")]=value
+    return values
+
+def read_env(env):
+    return {k[len(ENV_PREFIX):]:v for k,v in env.items() if k.startswith(ENV_PREFIX) and k[len(ENV_PREFIX):] in DEFAULTS}
+
+def resolve(path=None, env=None, overrides=None):
+    # defaults < config.yml < TRACKER_* environment < command line
+    values=dict(DEFAULTS)
+    values.update(read_yaml(path))
+    values.update(read_env(os.environ if env is None else env))
+    values.update({attr_name(k):v for k,v in (overrides or {}).items()})
+    values={k:coerce(k, v) for k,v in values.items()}
+    check(values)
+    return values
+
+def check(values):
+    # combinations the sketch can't serve
+    if values["SERIAL_MODE"]=="stream" and values["SERIAL_PROTOCOL"]=="binary":
+        raise ValueError("serial mode stream needs the text protocol: binary packets only carry blocking moves")
+
+def load(path=None, env=None, overrides=None):
+    # sets the merged values on Config and returns the ones that changed
+    changed={k:v for k,v in resolve(path, env, overrides).items() if getattr(Config, k)!=v}
+    for k,v in changed.items(): setattr(Config, k, v)
+    return changed
+
+class ConfigWatcher:
+    # polls the file's mtime and re-merges all layers when it changes, so
+    # environment and command-line values keep winning over the file. Changed
+    # LIVE keys go to on_change(changed); a bad file is logged and ignored
+    def __init__(self, path, on_change, interval=1.0, env=None, overrides=None):
+        self.path=path
+        self.on_change=on_change
+        self.interval=interval
+        self.env=env
+        self.overrides=overrides
+        self.mtime=self._mtime()
+        self.stop_event=threading.Event()
+        self.thread=None
+    def _mtime(self):
+        try: return os.stat(self.path).st_mtime_ns
+        except OSError: return None
+    def check(self):
+        mtime=self._mtime()
+        if mtime==self.mtime: return {}
+        self.mtime=mtime
+        try: changed=load(self.path, self.env, self.overrides)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            log.warning("config reload failed, keeping current values: %s", e)
+            return {}
+        live={k:v for k,v in changed.items() if k in LIVE}
+        restart=sorted(set(changed)-LIVE)
+        if restart: log.warning("config changes take effect on restart: %s", ", ".join(restart))
+        if live:
+            log.info("config reloaded: %s", live)
+            try: self.on_change(live)
+            except Exception: log.exception("applying config changes failed")
+        return live
+    def _run(self):
+        while not self.stop_event.wait(self.interval): self.check()
+    def start(self):
+        self.stop_event.clear()
+        self.thread=threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self.thread.start()
+        return self
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(1.0)
+            self.thread=None
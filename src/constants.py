@@ -1,4 +1,16 @@
 CMD_LEFT="L"
 CMD_RIGHT="R"
 CMD_STOP="S"
+CMD_MOVE="M"
 RESP_OK="OK"
+RESP_ERR="ERR"
+PACKET_SYNC=0xA5
+ACK_SYNC=0x5A
+ACK_OK=0
+ACK_BAD_CHECKSUM=1
+CMD_DELTA="D"
+CMD_TARGET="T"
+CMD_VELOCITY="V"
+CMD_HALT="H"
+CMD_POSITION="P"
+RESP_READY="READY"
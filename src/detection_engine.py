@@ -0,0 +1,160 @@
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+from src.logger import setup_logger
+
+log=setup_logger(__name__)
+
+def _default_factory():
+    from src.face_detector import FaceDetector
+    return FaceDetector()
+
+def _worker(shm_name, shape, slots, tasks, results, factory, current, index):
+    # each worker owns its own detector; frames are read in place from shared memory.
+    # current[index] is the slot being worked on, so the parent can fail it if we die;
+    # results is a SimpleQueue, so a result is in the pipe before the next task is taken
+    shm=shared_memory.SharedMemory(name=shm_name)
+    frames=np.ndarray((slots,)+shape, dtype=np.uint8, buffer=shm.buf)
+    detector=factory()
+    try:
+        while True:
+            task=tasks.get()
+            if task is None: break
+            slot,cam,seq=task
+            current[index]=slot
+            try: faces=detector.detect(frames[slot])
+            except Exception as e:
+                log.error("detect failed cam=%s seq=%s: %s", cam, seq, e)
+                faces=[]
+            results.put((slot,cam,seq,faces))
+            current[index]=-1
+    finally:
+        detector.close()
+        del frames
+        shm.close()
+
+class DetectionEngine:
+    # fans frames from several cameras out to a pool of detector processes.
+    # Frames travel through a ring of shared-memory slots, only (slot, cam, seq)
+    # is pickled, and results are re-ordered so each camera's come back in order.
+    # A frame whose worker died comes back with faces=None; once every worker
+    # is gone get() and submit() raise
+    def __init__(self, workers=None, shape=(480,640,3), slots=None, factory=_default_factory, start_method="spawn"):
+        self.workers=workers or os.cpu_count() or 1
+        self.shape=tuple(shape)
+        self.slots=slots or self.workers*2
+        self.factory=factory
+        self.ctx=mp.get_context(start_method)
+        self.shm=None
+        self.procs=[]
+        self.free=deque(range(self.slots))
+        self.busy={}
+        self.dead=set()
+        self.closing=False
+        self.order={}
+        self.done={}
+        self.out=queue.Queue()
+        self.lock=threading.Condition()
+        self.collector=None
+        self.stats={"submitted":0, "dropped":0, "completed":0, "failed":0}
+    def start(self):
+        self.shm=shared_memory.SharedMemory(create=True, size=self.slots*int(np.prod(self.shape)))
+        self.frames=np.ndarray((self.slots,)+self.shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.tasks=self.ctx.Queue()
+        self.results=self.ctx.SimpleQueue()
+        self.current=self.ctx.Array("i", [-1]*self.workers, lock=False)
+        for i in range(self.workers):
+            p=self.ctx.Process(target=_worker, args=(self.shm.name, self.shape, self.slots, self.tasks, self.results, self.factory,
+                                                     self.current, i), daemon=True)
+            p.start()
+            self.procs.append(p)
+        self.collector=threading.Thread(target=self._collect, name="engine-collect", daemon=True)
+        self.collector.start()
+    def submit(self, cam, seq, frame, block=False, timeout=None):
+        # returns False when every slot is busy and the frame was dropped
+        if frame.shape!=self.shape: raise ValueError(f"frame shape {frame.shape} != {self.shape}")
+        with self.lock:
+            self._reap()
+            self._check()
+            if not self.free and not (block and self.lock.wait_for(lambda: self.free, timeout)):
+                self.stats["dropped"]+=1
+                return False
+            slot=self.free.popleft()
+            self.busy[slot]=(cam,seq)
+            self.order.setdefault(cam,deque()).append(seq)
+            self.stats["submitted"]+=1
+        np.copyto(self.frames[slot], frame)
+        self.tasks.put((slot,cam,seq))
+        return True
+    def _collect(self):
+        while True:
+            item=self.results.get()
+            if item is None: return
+            with self.lock:
+                self._finish(*item)
+                self.lock.notify_all()
+    def _finish(self, slot, cam, seq, faces):
+        # a result that arrives after its worker was reaped no longer owns the slot
+        if self.busy.get(slot)!=(cam,seq): return
+        del self.busy[slot]
+        self.free.append(slot)
+        self.done[(cam,seq)]=faces
+        pending=self.order[cam]
+        while pending and (cam,pending[0]) in self.done:
+            s=pending.popleft()
+            self.out.put((cam,s,self.done.pop((cam,s))))
+            self.stats["completed"]+=1
+    def _reap(self):
+        # fail the frame a dead worker was holding so its camera's order can advance;
+        # with no worker left nothing still queued will be picked up, so fail it all
+        if self.closing: return
+        for i,p in enumerate(self.procs):
+            if i in self.dead or p.exitcode is None: continue
+            self.dead.add(i)
+            slot=self.current[i]
+            log.error("detector worker %d exited with %s%s", i, p.exitcode, f" holding {self.busy.get(slot)}" if slot>=0 else "")
+            if slot in self.busy: self._fail(slot)
+        if self.dead and len(self.dead)==len(self.procs):
+            for slot in list(self.busy): self._fail(slot)
+        self.lock.notify_all()
+    def _fail(self, slot):
+        self.stats["failed"]+=1
+        self._finish(slot, *self.busy[slot], None)
+    def _check(self):
+        if self.procs and len(self.dead)==len(self.procs): raise RuntimeError("all detector workers have exited")
+    def get(self, timeout=None):
+        # next (cam, seq, faces); per camera in submission order
+        end=None if timeout is None else time.monotonic()+timeout
+        while True:
+            try: return self.out.get(timeout=0.5 if end is None else max(0.0, min(0.5, end-time.monotonic())))
+            except queue.Empty:
+                with self.lock:
+                    self._reap()
+                    if self.out.empty():
+                        self._check()
+                        if end is not None and time.monotonic()>=end: return None
+    def close(self):
+        with self.lock: self.closing=True
+        for _ in self.procs: self.tasks.put(None)
+        for p in self.procs:
+            p.join(5)
+            if p.is_alive(): p.terminate()
+        self.procs=[]
+        if self.collector:
+            self.results.put(None)
+            self.collector.join()
+            self.collector=None
+        if self.shm:
+            del self.frames
+            self.shm.close()
+            self.shm.unlink()
+            self.shm=None
+    def __enter__(self):
+        self.start()
+        return self
+    def __exit__(self, *exc): self.close()
@@ -1,22 +1,61 @@
 import cv2
-import mediapipe as mp
+import numpy as np
+from src.tracker_utils import expand_bbox, to_pixels
+from src.metrics import metrics
 
 class FaceDetector:
-    def __init__(self, conf=0.5):
-        self.mp_face=mp.solutions.face_detection
-        self.detector=self.mp_face.FaceDetection(min_detection_confidence=conf)
-    def detect(self, frame):
-        rgb=cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results=self.detector.process(rgb)
-        faces=[]
+    # roi_margin: search an expanded window around the previous face first and
+    # fall back to the full frame; scale: downscale the full frame before inference;
+    # model: MediaPipe model_selection (0 short range, 1 full range). MediaPipe
+    # is imported and its graph built on first use or by warmup(). The RGB
+    # conversion and the downscale write into arrays reused across frames
+    def __init__(self, conf=0.5, roi_margin=None, scale=1.0, model=0):
+        self.conf=conf
+        self.model=model
+        self.detector=None
+        self.roi_margin=roi_margin
+        self.scale=scale
+        self.last=None
+        self.stats={"roi":0, "full":0}
+        self.bufs={}
+    def _graph(self):
+        if self.detector is None:
+            import mediapipe as mp
+            self.detector=mp.solutions.face_detection.FaceDetection(model_selection=self.model, min_detection_confidence=self.conf)
+        return self.detector
+    def warmup(self, w=640, h=480):
+        # the first process() call initializes the graph; pay for it before the loop starts
+        self._graph().process(np.zeros((h,w,3), dtype=np.uint8))
+    def _buf(self, name, shape):
+        # roi crops change size from frame to frame, full frames don't
+        buf=self.bufs.get(name)
+        if buf is None or buf.shape!=shape: buf=self.bufs[name]=np.empty(shape, dtype=np.uint8)
+        return buf
+    def _process(self, img, slot="full"):
+        with metrics.timer("color_convert"): rgb=cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self._buf(slot, img.shape))
+        with metrics.timer("inference"): results=self._graph().process(rgb)
+        boxes=[]
         if results.detections:
             for d in results.detections:
                 bbox=d.location_data.relative_bounding_box
-                h,w=frame.shape[:2]
-                x=int(bbox.xmin*w)
-                y=int(bbox.ymin*h)
-                width=int(bbox.width*w)
-                height=int(bbox.height*h)
-                faces.append((x,y,width,height))
-        return faces
-    def close(self): self.detector.close()
+                boxes.append(((bbox.xmin, bbox.ymin, bbox.width, bbox.height), d.score[0] if d.score else 0.0))
+        return boxes
+    def detect(self, frame, scores=False):
+        # bboxes in frame pixels; with scores=True each entry is (x, y, w, h, score)
+        h,w=frame.shape[:2]
+        faces=[]
+        if self.roi_margin is not None and self.last:
+            x0,y0,x1,y1=expand_bbox(self.last, self.roi_margin, w, h)
+            faces=[to_pixels(b,x0,y0,x1-x0,y1-y0)+(sc,) for b,sc in self._process(frame[y0:y1,x0:x1], "roi")]
+            if faces: self.stats["roi"]+=1
+        if not faces:
+            img=frame
+            if self.scale!=1.0:
+                sw,sh=max(1,round(w*self.scale)),max(1,round(h*self.scale))
+                img=cv2.resize(frame, (sw,sh), dst=self._buf("small", (sh,sw,3)), interpolation=cv2.INTER_AREA)
+            faces=[to_pixels(b,0,0,w,h)+(sc,) for b,sc in self._process(img)]
+            self.stats["full"]+=1
+        self.last=faces[0][:4] if faces else None
+        return faces if scores else [f[:4] for f in faces]
+    def close(self):
+        if self.detector: self.detector.close()
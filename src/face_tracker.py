@@ -1,43 +1,224 @@
-import cv2
-from src.camera import Camera
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.frame_source import make_source
 from src.face_detector import FaceDetector
+from src.roi_tracker import DetectTrackDetector
 from src.position_calculator import PositionCalculator
+from src.pid_controller import PIDController
+from src.motion_model import KalmanTracker
+from src.target_selector import TargetSelector
 from src.serial_comm import SerialComm
 from src.simulator import Simulator
-from src.config import Config
+from src.config import Config, check
+from src.pipeline import FramePool, Pipeline
+from src.renderer import Renderer
+from src.live_view import live_view
+from src.transport import COALESCERS, AsyncTransport, StreamTransport
+from src.logger import setup_logger
+from src.metrics import metrics
+
+log=setup_logger(__name__)
+
+def _pick(value, default):
+    return default if value is None else value
+
+def _ms(t):
+    return round((time.perf_counter()-t)*1000, 1)
+
+def _timed(fn):
+    t=time.perf_counter()
+    fn()
+    return _ms(t)
 
 class FaceTracker:
-    def __init__(self, port=None, sim=False):
+    # arguments left as None come from Config when the tracker is built, so
+    # values loaded from config.yml, the environment or the command line apply
+    def __init__(self, port=None, sim=False, pipelined=False, serial_mode=None, detect_interval=None,
+                 roi_margin=None, scale=None, control=None, predict=None, camera=None, comm=None, display=True,
+                 max_frames=None, recorder=None, target_policy=None, tilt=None, protocol=None):
+        serial_mode=_pick(serial_mode, Config.SERIAL_MODE)
+        detect_interval=_pick(detect_interval, Config.DETECT_INTERVAL)
+        control=_pick(control, Config.CONTROL)
+        predict=_pick(predict, Config.PREDICT)
+        target_policy=_pick(target_policy, Config.TARGET_POLICY)
+        tilt=_pick(tilt, Config.TILT)
+        protocol=_pick(protocol, Config.SERIAL_PROTOCOL)
+        if comm is None and not sim: check({"SERIAL_MODE":serial_mode, "SERIAL_PROTOCOL":protocol})
         self.sim=sim
-        self.camera=Camera(Config.CAMERA_INDEX, Config.FRAME_WIDTH, Config.FRAME_HEIGHT)
-        self.detector=FaceDetector()
-        self.calc=PositionCalculator(Config.FRAME_WIDTH, Config.FRAME_HEIGHT, Config.DEAD_ZONE)
-        self.comm=Simulator() if sim else SerialComm(port, Config.BAUD_RATE)
+        self.pipelined=pipelined
+        self.camera=camera or make_source(_pick(Config.CAMERA_SOURCE, Config.CAMERA_INDEX), Config.FRAME_WIDTH, Config.FRAME_HEIGHT,
+                                          Config.CAMERA_FOURCC, Config.CAMERA_FPS, Config.CAMERA_BUFFER, Config.CAMERA_BACKEND)
+        self.detector=FaceDetector(Config.MIN_CONFIDENCE, _pick(roi_margin, Config.ROI_MARGIN), _pick(scale, Config.DETECT_SCALE),
+                                   Config.MODEL_SELECTION)
+        if detect_interval>1: self.detector=DetectTrackDetector(self.detector, detect_interval, Config.REDETECT_THRESHOLD)
+        pid=tilt_pid=None
+        if control=="pid":
+            pid=self.make_pid()
+            if tilt: tilt_pid=self.make_pid()
+        motion=KalmanTracker(Config.KALMAN_ACCEL_NOISE, Config.KALMAN_MEAS_NOISE, Config.KALMAN_MAX_COAST) if predict else None
+        self.selector=TargetSelector(Config.FRAME_WIDTH, Config.FRAME_HEIGHT, target_policy, Config.TARGET_SWITCH_MARGIN) if target_policy else None
+        self.calc=PositionCalculator(Config.FRAME_WIDTH, Config.FRAME_HEIGHT, Config.DEAD_ZONE, pid, Config.MAX_STEPS, motion,
+                                     tilt, tilt_pid, Config.STEP_MULTIPLIER, Config.PX_PER_STEP)
+        self.comm=comm or (Simulator(Config.STEP_DELAY, max_speed=Config.MAX_SPEED, accel=Config.ACCEL) if sim else
+                           SerialComm(port, Config.BAUD_RATE, protocol=protocol, speed=Config.MOTOR_SPEED))
+        if serial_mode=="async": self.comm=AsyncTransport(self.comm, coalescing=Config.COALESCING)
+        elif serial_mode=="stream": self.comm=StreamTransport(self.comm)
+        self.renderer=Renderer(Config.DISPLAY_EVERY, Config.DISPLAY_FPS, on_quit=self.request_stop) if display else None
+        self.max_frames=max_frames
+        self.recorder=recorder
+        self.pipeline=None
+        self.running=False
+        self.stop_requested=False
+        self.last_t=None
+        self.frame_latency=0.0
+        self.serial_latency=0.0
+        self.stats={"frames":0, "commands":0}
+        self.startup_ms={}
+        self.t_start=None
+    @staticmethod
+    def make_pid():
+        return PIDController(Config.PID_KP, Config.PID_KI, Config.PID_KD, out_limit=Config.PID_OUT_LIMIT,
+                             d_alpha=Config.PID_D_ALPHA, rate_limit=Config.PID_RATE_LIMIT)
+    def apply_config(self, *_):
+        # re-reads the live-reloadable Config values; called from the config
+        # watcher thread, so every change is a single attribute assignment
+        c=self.calc
+        c.dz,c.max_steps,c.multiplier,c.px_per_step=Config.DEAD_ZONE,Config.MAX_STEPS,Config.STEP_MULTIPLIER,Config.PX_PER_STEP
+        for pid in (c.pid, c.tilt_pid):
+            if pid is None: continue
+            pid.kp,pid.ki,pid.kd=Config.PID_KP,Config.PID_KI,Config.PID_KD
+            pid.out_limit,pid.d_alpha,pid.rate_limit=Config.PID_OUT_LIMIT,Config.PID_D_ALPHA,Config.PID_RATE_LIMIT
+        if c.motion: c.motion.max_coast=Config.KALMAN_MAX_COAST
+        base=self.detector.detector if isinstance(self.detector, DetectTrackDetector) else self.detector
+        base.roi_margin,base.scale=Config.ROI_MARGIN,Config.DETECT_SCALE
+        if isinstance(self.detector, DetectTrackDetector):
+            self.detector.interval,self.detector.threshold=Config.DETECT_INTERVAL,Config.REDETECT_THRESHOLD
+        elif Config.DETECT_INTERVAL>1:
+            self.detector=DetectTrackDetector(base, Config.DETECT_INTERVAL, Config.REDETECT_THRESHOLD)
+        if self.selector: self.selector.switch_margin=Config.TARGET_SWITCH_MARGIN
+        if isinstance(self.comm, AsyncTransport): self.comm.coalesce=COALESCERS[Config.COALESCING]
+        if self.renderer:
+            self.renderer.every=max(1, Config.DISPLAY_EVERY)
+            self.renderer.min_interval=1/Config.DISPLAY_FPS if Config.DISPLAY_FPS else 0.0
+    def lead(self):
+        # how far ahead to aim: age of the frame at actuation plus the serial round trip
+        rtt=self.comm.stats["rtt_ms"]/1000 if hasattr(self.comm, "stats") else self.serial_latency
+        return min(self.frame_latency+rtt, Config.MAX_LEAD)
+    def actuate(self, faces, ts=None):
+        now=time.monotonic()
+        dt=now-self.last_t if self.last_t else 0.0
+        self.last_t=now
+        if ts is not None:
+            self.frame_latency+=0.2*(now-ts-self.frame_latency)
+            metrics.observe("frame_age", (now-ts)*1000)
+        self.stats["frames"]+=1
+        with metrics.timer("calculate"): cmd=self.calc.command(faces[0] if faces else None, dt, self.lead())
+        if cmd:
+            t=time.monotonic()
+            with metrics.timer("serial"): self.comm.send_command(cmd)
+            self.serial_latency+=0.2*(time.monotonic()-t-self.serial_latency)
+            self.stats["commands"]+=1
+            metrics.inc("commands")
+            if self.stats["commands"]==1 and self.t_start is not None:
+                self.startup_ms["first_command"]=_ms(self.t_start)
+                metrics.observe("startup_first_command", self.startup_ms["first_command"])
+                log.info("first command %.0f ms after start", self.startup_ms["first_command"])
+    def detect(self, frame):
+        # the face to follow is always first
+        with metrics.timer("detect"):
+            if self.selector is None: faces=self.detector.detect(frame)
+            else:
+                found=self.detector.detect(frame, scores=True)
+                target=self.selector.select(found)
+                faces=[f[:4] for f in found]
+                if target:
+                    faces=[target.bbox]+[f for f in faces if f!=target.bbox]
+                    # track the chosen face between detections, not the detector's first
+                    if isinstance(self.detector, DetectTrackDetector): self.detector.follow(frame, target.bbox)
+                    # and centre the next ROI search on it
+                    base=self.detector.detector if isinstance(self.detector, DetectTrackDetector) else self.detector
+                    if isinstance(base, FaceDetector): base.last=target.bbox
+        metrics.inc("frames")
+        return faces
+    def publish(self, frame, faces):
+        if self.renderer: self.renderer.submit(frame, faces)
+        if self.recorder: self.recorder.write(frame, bool(faces))
+        live_view.publish(frame, faces, {"faces":faces, "stats":self.stats, "lead_s":round(self.lead(),4), "startup_ms":self.startup_ms})
+    def request_stop(self, *_):
+        # sticky, so a signal that lands during startup() still stops the run
+        self.stop_requested=True
         self.running=False
+    def done(self):
+        return self.max_frames is not None and self.stats["frames"]>=self.max_frames
+    def startup(self):
+        # camera, serial port and detector come up in parallel, so waiting for the
+        # sketch's READY overlaps with opening the camera and building the graph
+        phases={"camera":self.camera.open, "serial":self.comm.connect,
+                "detector":lambda: self.detector.warmup(Config.FRAME_WIDTH, Config.FRAME_HEIGHT)}
+        t=time.perf_counter()
+        with ThreadPoolExecutor(len(phases), thread_name_prefix="startup") as pool:
+            futures={name:pool.submit(_timed, fn) for name,fn in phases.items()}
+        self.startup_ms={name:f.result() for name,f in futures.items()}
+        self.startup_ms["total"]=_ms(t)
+        for name,ms in self.startup_ms.items(): metrics.observe(f"startup_{name}", ms)
+        log.info("startup ms %s", self.startup_ms)
+        self.resize(self.camera.w, self.camera.h)
+    def resize(self, w, h):
+        # geometry follows the frames the camera actually delivers, which may
+        # not be the size that was asked for
+        if (w,h)==(self.calc.fw,self.calc.fh): return
+        log.warning("camera delivers %dx%d, not %dx%d", w, h, self.calc.fw, self.calc.fh)
+        self.calc.resize(w, h)
+        if self.selector: self.selector.resize(w, h)
+        if self.recorder: self.recorder.size=(w,h)
     def start(self):
-        self.camera.open()
-        self.comm.connect()
-        self.running=True
+        self.t_start=time.perf_counter()
         try:
-            while self.running:
-                frame=self.camera.read()
-                faces=self.detector.detect(frame)
-                if faces:
-                    face=faces[0]
-                    offset=self.calc.calculate_offset(face)
-                    if self.calc.needs_adjustment(offset):
-                        direction=self.calc.get_direction(offset)
-                        steps=self.calc.calculate_steps(offset)
-                        self.comm.send_command(f"{direction}{steps:03d}")
-                    x,y,w,h=face
-                    cv2.rectangle(frame,(x,y),(x+w,y+h),(0,255,0),2)
-                cv2.imshow("Tracker",frame)
-                if cv2.waitKey(1)&0xFF==ord("q"): break
+            self.running=not self.stop_requested
+            self.startup()
+            if not self.running: return
+            if self.renderer: self.renderer.start()
+            if self.recorder:
+                self.recorder.start()
+                metrics.gauge("recorder_dropped", lambda: self.recorder.dropped)
+            if self.pipelined: self._run_pipeline()
+            else: self._run_sequential()
         except KeyboardInterrupt: pass
         finally: self.stop()
+    def _run_sequential(self):
+        # one frame buffer, refilled every iteration: nothing keeps it past publish()
+        frame=None
+        while self.running:
+            frame=self.camera.read(frame)
+            ts=time.monotonic()
+            faces=self.detect(frame)
+            self.actuate(faces, ts)
+            self.publish(frame, faces)
+            if self.done(): break
+    def _run_pipeline(self):
+        self.pipeline=Pipeline(self.camera.read, self.detect, self.actuate, pool=FramePool(Config.FRAME_POOL))
+        metrics.gauge("frames_dropped", lambda: self.pipeline.frames.dropped if self.pipeline else 0)
+        self.pipeline.start()
+        last=time.monotonic()
+        while self.running and self.pipeline.running():
+            item=self.pipeline.display.get(timeout=0.1)
+            if item:
+                self.publish(*item)
+                self.pipeline.release(item[0])
+            if self.done(): break
+            if time.monotonic()-last>=Config.STATS_INTERVAL:
+                log.info("pipeline %s commands %s", self.pipeline.report(), self.stats)
+                last=time.monotonic()
+        self.pipeline.check()
     def stop(self):
         self.running=False
+        log.info("tracker %s", self.stats)
+        if self.pipeline:
+            self.pipeline.stop()
+            log.info("pipeline %s", self.pipeline.report())
+            self.pipeline=None
         self.camera.release()
         self.detector.close()
         self.comm.close()
-        cv2.destroyAllWindows()
+        if self.renderer: self.renderer.stop()
+        if self.recorder: self.recorder.release()
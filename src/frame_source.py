@@ -0,0 +1,129 @@
+import math
+import os
+import time
+import cv2
+import numpy as np
+from src.camera import Camera
+from src.exceptions import CameraException
+
+IMAGE_EXTS=(".jpg",".jpeg",".png",".bmp")
+
+def fit(img, w, h, out=None):
+    # img as a w x h frame, written into out when out has that shape
+    if w and h and img.shape[:2]!=(h,w):
+        return cv2.resize(img, (w,h), dst=out if out is not None and out.shape[:2]==(h,w) else None)
+    if out is None or out.shape!=img.shape: return img
+    np.copyto(out, img)
+    return out
+
+def make_source(spec, w=640, h=480, fourcc=None, fps=None, buffer_size=1, backend=None, loop=True):
+    # a device index or /dev/video* -> Camera, "synthetic" -> SyntheticSource,
+    # a directory -> ImageDirSource, anything else -> VideoFileSource
+    if isinstance(spec, int) or str(spec).isdigit(): return Camera(int(spec), w, h, fourcc, fps, buffer_size, backend)
+    if spec.startswith("/dev/"): return Camera(spec, w, h, fourcc, fps, buffer_size, backend or "v4l2")
+    if spec=="synthetic": return SyntheticSource(w, h, fps=fps)
+    if os.path.isdir(spec): return ImageDirSource(spec, w, h, fps, loop)
+    return VideoFileSource(spec, w, h, loop)
+
+def _pace(src):
+    # sleeps until the next frame is due at src.fps
+    if not src.fps: return
+    src.t+=1/src.fps
+    delay=src.t-time.monotonic()
+    if delay>0: time.sleep(delay)
+
+class SyntheticSource:
+    # Camera stand-in that renders a face-like figure sweeping across a noisy
+    # background; deterministic for a given seed
+    def __init__(self, w=640, h=480, period=90, fps=None, seed=0):
+        self.w=w
+        self.h=h
+        self.period=period
+        self.fps=fps
+        self.seed=seed
+        self.background=None
+    def open(self):
+        rng=np.random.default_rng(self.seed)
+        self.background=rng.integers(40,90,(self.h,self.w,3), dtype=np.uint8)
+        self.i=0
+        self.t=time.monotonic()
+    def read(self, out=None):
+        if self.background is None: raise CameraException("Not open")
+        _pace(self)
+        phase=2*math.pi*self.i/self.period
+        self.i+=1
+        r=max(8,self.h//8)
+        cx=int(self.w/2+self.w/3*math.sin(phase))
+        cy=int(self.h/2+self.h/8*math.sin(2*phase))
+        if out is None or out.shape!=self.background.shape: out=self.background.copy()
+        else: np.copyto(out, self.background)
+        frame=out
+        cv2.ellipse(frame,(cx,cy),(r,int(r*1.3)),0,0,360,(150,180,225),-1)
+        for ex in (cx-r//2.5, cx+r//2.5):
+            cv2.circle(frame,(int(ex),cy-r//3),max(2,r//7),(40,30,30),-1)
+        cv2.ellipse(frame,(cx,cy+r//2),(r//2,r//6),0,0,180,(60,60,160),-1)
+        return frame
+    def release(self): self.background=None
+
+class VideoFileSource:
+    # Camera stand-in backed by a recorded video, resized to w x h and looped.
+    # Frames the size of the video are decoded straight into `out`; others go
+    # through one reused decode buffer and are resized into `out`
+    def __init__(self, path, w=None, h=None, loop=True):
+        self.path=path
+        self.w=w
+        self.h=h
+        self.loop=loop
+        self.cap=None
+        self.raw=None
+    def open(self):
+        self.cap=cv2.VideoCapture(self.path)
+        if not self.cap.isOpened(): raise CameraException(f"Cannot open {self.path}")
+        size=int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.resize=bool(self.w and self.h) and size!=(self.w,self.h)
+        if not self.resize: self.w,self.h=size
+    def read(self, out=None):
+        buf=self.raw if self.resize else out
+        ret,frame=self.cap.read(buf)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret,frame=self.cap.read(buf)
+        if not ret: raise CameraException("Read failed")
+        if not self.resize: return frame
+        self.raw=frame
+        return fit(frame, self.w, self.h, out)
+    def release(self):
+        if self.cap: self.cap.release()
+
+class ImageDirSource:
+    # Camera stand-in that plays the images in a directory in name order,
+    # resized to w x h (the first image's size by default)
+    def __init__(self, path, w=None, h=None, fps=None, loop=True):
+        self.path=path
+        self.w=w
+        self.h=h
+        self.fps=fps
+        self.loop=loop
+        self.files=None
+    def open(self):
+        self.files=sorted(os.path.join(self.path, f) for f in os.listdir(self.path) if f.lower().endswith(IMAGE_EXTS))
+        if not self.files: raise CameraException(f"No images in {self.path}")
+        if not (self.w and self.h):
+            first=self._load(self.files[0])
+            self.h,self.w=first.shape[:2]
+        self.i=0
+        self.t=time.monotonic()
+    def _load(self, path):
+        img=cv2.imread(path, cv2.IMREAD_COLOR)
+        if img is None: raise CameraException(f"Cannot read {path}")
+        return img
+    def read(self, out=None):
+        if self.files is None: raise CameraException("Not open")
+        if self.i>=len(self.files):
+            if not self.loop: raise CameraException("Read failed")
+            self.i=0
+        _pace(self)
+        img=self._load(self.files[self.i])
+        self.i+=1
+        return fit(img, self.w, self.h, out)
+    def release(self): self.files=None
@@ -0,0 +1,89 @@
+import threading
+import time
+import cv2
+from src.metrics import metrics
+
+class LiveView:
+    # annotated frames for remote viewers. publish() is all the control loop pays:
+    # nothing without viewers, otherwise at most one frame copy per encode slot.
+    # A single encoder thread JPEG-encodes the newest frame once and every client
+    # is handed the same bytes; slow clients just skip to whatever is newest.
+    # Quality and rate back off when encoding eats more than `budget` of a slot
+    def __init__(self, max_fps=15, min_fps=2, quality=80, min_quality=30, budget=0.5):
+        self.max_fps=max_fps
+        self.min_fps=min_fps
+        self.max_quality=quality
+        self.min_quality=min_quality
+        self.budget=budget
+        self.fps=max_fps
+        self.quality=quality
+        self.viewers=0
+        self.pending=None
+        self.last_publish=0.0
+        self.jpeg=None
+        self.seq=0
+        self.state={}
+        self.cond=threading.Condition()
+        self.wake=threading.Event()
+        self.thread=None
+        self.running=False
+    def publish(self, frame, faces, state=None):
+        self.state=state or {}
+        if not self.viewers: return
+        now=time.monotonic()
+        if now-self.last_publish<1/self.fps: return
+        self.last_publish=now
+        self.pending=(frame.copy(), faces)
+        self.wake.set()
+    def _ensure_encoder(self):
+        if self.thread and self.thread.is_alive(): return
+        self.running=True
+        self.thread=threading.Thread(target=self._encode_loop, name="live-view", daemon=True)
+        self.thread.start()
+    def _encode_loop(self):
+        while self.running:
+            if not self.wake.wait(0.5): continue
+            self.wake.clear()
+            item,self.pending=self.pending,None
+            if item is None: continue
+            frame,faces=item
+            t=time.perf_counter()
+            for x,y,w,h in faces[:1]: cv2.rectangle(frame,(x,y),(x+w,y+h),(0,255,0),2)
+            ok,buf=cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            elapsed=time.perf_counter()-t
+            metrics.observe("live_view_encode", elapsed*1000)
+            if not ok: continue
+            self._adapt(elapsed)
+            with self.cond:
+                self.jpeg=buf.tobytes()
+                self.seq+=1
+                self.cond.notify_all()
+    def _adapt(self, elapsed):
+        slot=1/self.fps
+        if elapsed>self.budget*slot:
+            if self.quality>self.min_quality: self.quality=max(self.min_quality, self.quality-10)
+            else: self.fps=max(self.min_fps, self.fps*0.8)
+        elif elapsed<self.budget*slot/4:
+            if self.fps<self.max_fps: self.fps=min(self.max_fps, self.fps*1.25)
+            elif self.quality<self.max_quality: self.quality=min(self.max_quality, self.quality+5)
+    def frames(self, timeout=5.0):
+        # one multipart chunk per new frame; used as the body of a streaming response
+        with self.cond: self.viewers+=1
+        self._ensure_encoder()
+        try:
+            seen=0
+            while True:
+                with self.cond:
+                    if not self.cond.wait_for(lambda: self.seq!=seen or not self.running, timeout): continue
+                    if not self.running: return
+                    seen,jpeg=self.seq,self.jpeg
+                yield b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "+str(len(jpeg)).encode()+b"\r\n\r\n"+jpeg+b"\r\n"
+        finally:
+            with self.cond: self.viewers-=1
+    def close(self):
+        self.running=False
+        self.wake.set()
+        with self.cond: self.cond.notify_all()
+        if self.thread: self.thread.join(1.0)
+
+live_view=LiveView()
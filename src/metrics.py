@@ -0,0 +1,114 @@
+import bisect
+import threading
+import time
+from src.logger import setup_logger
+
+log=setup_logger(__name__)
+
+BUCKETS_MS=(0.25,0.5,1,2,5,10,20,33,50,100,200,500,1000)
+
+class Histogram:
+    # fixed-bucket latency histogram; observe() is a bisect and three adds, no lock
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets=buckets
+        self.reset()
+    def reset(self):
+        self.counts=[0]*(len(self.buckets)+1)
+        self.count=0
+        self.sum=0.0
+        self.max=0.0
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(self.buckets, ms)]+=1
+        self.count+=1
+        self.sum+=ms
+        if ms>self.max: self.max=ms
+    def quantile(self, q):
+        # upper bound of the bucket holding the q-th observation
+        if not self.count: return 0.0
+        rank=q*self.count
+        seen=0
+        for i,c in enumerate(self.counts):
+            seen+=c
+            if seen>=rank: return self.buckets[i] if i<len(self.buckets) else self.max
+        return self.max
+    def as_dict(self):
+        return {"count":self.count, "mean_ms":round(self.sum/self.count,3) if self.count else 0.0,
+                "p50_ms":self.quantile(0.5), "p95_ms":self.quantile(0.95), "p99_ms":self.quantile(0.99), "max_ms":round(self.max,3)}
+
+class _Timer:
+    __slots__=("hist","t")
+    def __init__(self, hist): self.hist=hist
+    def __enter__(self):
+        self.t=time.perf_counter()
+        return self
+    def __exit__(self, *exc):
+        self.hist.observe((time.perf_counter()-self.t)*1000)
+
+class Metrics:
+    def __init__(self):
+        self.lock=threading.Lock()
+        self.reset()
+    def reset(self):
+        self.hists={}
+        self.counters={}
+        self.gauges={}
+        self.t0=time.monotonic()
+    def hist(self, name):
+        h=self.hists.get(name)
+        if h is None:
+            with self.lock: h=self.hists.setdefault(name, Histogram())
+        return h
+    def timer(self, name): return _Timer(self.hist(name))
+    def observe(self, name, ms): self.hist(name).observe(ms)
+    def inc(self, name, n=1): self.counters[name]=self.counters.get(name,0)+n
+    def gauge(self, name, fn): self.gauges[name]=fn
+    def snapshot(self):
+        elapsed=max(time.monotonic()-self.t0, 1e-9)
+        return {"uptime_s":round(elapsed,3),
+                "timings":{n:h.as_dict() for n,h in list(self.hists.items())},
+                "counters":dict(self.counters),
+                "rates":{n:round(c/elapsed,3) for n,c in list(self.counters.items())},
+                "gauges":{n:fn() for n,fn in list(self.gauges.items())}}
+    def summary(self):
+        snap=self.snapshot()
+        parts=[f"{n}={t['mean_ms']}/{t['p95_ms']}ms" for n,t in snap["timings"].items()]
+        parts+=[f"{n}={r}/s" for n,r in snap["rates"].items()]
+        parts+=[f"{n}={v}" for n,v in snap["gauges"].items()]
+        return " ".join(parts)
+    def to_prometheus(self, prefix="tracker"):
+        lines=[]
+        for n,h in list(self.hists.items()):
+            name=f"{prefix}_{n}_ms"
+            lines.append(f"# TYPE {name} histogram")
+            acc=0
+            for b,c in zip(list(h.buckets)+["+Inf"], h.counts):
+                acc+=c
+                lines.append(f'{name}_bucket{{le="{b}"}} {acc}')
+            lines.append(f"{name}_sum {h.sum}")
+            lines.append(f"{name}_count {h.count}")
+        for n,c in list(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{n}_total counter")
+            lines.append(f"{prefix}_{n}_total {c}")
+        for n,fn in list(self.gauges.items()):
+            lines.append(f"# TYPE {prefix}_{n} gauge")
+            lines.append(f"{prefix}_{n} {fn()}")
+        return "\n".join(lines)+"\n"
+
+class MetricsReporter:
+    # logs a one-line summary every `interval` seconds from a daemon thread
+    def __init__(self, registry, interval=10.0, logger=log):
+        self.registry=registry
+        self.interval=interval
+        self.logger=logger
+        self.stop_event=threading.Event()
+        self.thread=None
+    def start(self):
+        self.thread=threading.Thread(target=self._run, name="metrics-reporter", daemon=True)
+        self.thread.start()
+    def _run(self):
+        while not self.stop_event.wait(self.interval): self.logger.info("metrics %s", self.registry.summary())
+    def stop(self):
+        self.stop_event.set()
+        if self.thread: self.thread.join(1.0)
+
+metrics=Metrics()
@@ -0,0 +1,60 @@
+import numpy as np
+
+class KalmanTracker:
+    # constant-velocity Kalman filter on the bbox center, state (cx, cy, vx, vy) in
+    # pixels and pixels/s. Smooths jittery boxes, coasts through up to max_coast
+    # missed detections and extrapolates the center `lead` seconds ahead
+    def __init__(self, accel_noise=2000.0, meas_noise=16.0, max_coast=5, size_alpha=0.3):
+        self.accel_noise=accel_noise
+        self.R=np.eye(2)*meas_noise
+        self.H=np.array([[1.0,0,0,0],[0,1.0,0,0]])
+        self.max_coast=max_coast
+        self.size_alpha=size_alpha
+        self.reset()
+    def reset(self):
+        self.x=None
+        self.P=None
+        self.size=None
+        self.missed=0
+    def predict(self, dt):
+        F=np.eye(4)
+        F[0,2]=F[1,3]=dt
+        q=self.accel_noise
+        G=np.array([[dt*dt/2,0],[0,dt*dt/2],[dt,0],[0,dt]])
+        self.x=F@self.x
+        self.P=F@self.P@F.T+G@G.T*q
+    def update(self, center):
+        y=np.asarray(center, dtype=float)-self.H@self.x
+        S=self.H@self.P@self.H.T+self.R
+        K=self.P@self.H.T@np.linalg.inv(S)
+        self.x=self.x+K@y
+        self.P=(np.eye(4)-K@self.H)@self.P
+    def step(self, bbox, dt, lead=0.0):
+        # feed one frame (bbox or None) and get the bbox to aim at, or None once lost
+        if self.x is None:
+            if bbox is None: return None
+            x,y,w,h=bbox
+            self.x=np.array([x+w/2, y+h/2, 0.0, 0.0])
+            self.P=np.diag([self.R[0,0], self.R[1,1], 1e5, 1e5])
+            self.size=(float(w), float(h))
+            return self.aim(lead)
+        self.predict(dt)
+        if bbox is None:
+            self.missed+=1
+            if self.missed>self.max_coast:
+                self.reset()
+                return None
+        else:
+            x,y,w,h=bbox
+            self.missed=0
+            self.update((x+w/2, y+h/2))
+            a=self.size_alpha
+            self.size=(self.size[0]+a*(w-self.size[0]), self.size[1]+a*(h-self.size[1]))
+        return self.aim(lead)
+    def velocity(self):
+        return (float(self.x[2]), float(self.x[3])) if self.x is not None else (0.0, 0.0)
+    def aim(self, lead=0.0):
+        cx=self.x[0]+self.x[2]*lead
+        cy=self.x[1]+self.x[3]*lead
+        w,h=self.size
+        return (int(round(cx-w/2)), int(round(cy-h/2)), int(round(w)), int(round(h)))
@@ -1,13 +1,34 @@
 class PIDController:
-    def __init__(self, kp=1.0, ki=0.1, kd=0.05):
+    # out_limit clamps the output and stops integrating while saturated (anti-windup),
+    # d_alpha low-pass filters the derivative (1.0 = unfiltered) and rate_limit caps
+    # how fast the output may change per second
+    def __init__(self, kp=1.0, ki=0.1, kd=0.05, out_limit=None, i_limit=None, d_alpha=1.0, rate_limit=None):
         self.kp=kp
         self.ki=ki
         self.kd=kd
+        self.out_limit=out_limit
+        self.i_limit=i_limit
+        self.d_alpha=d_alpha
+        self.rate_limit=rate_limit
+        self.reset()
+    def reset(self):
         self.prev_error=0
         self.integral=0
+        self.derivative=0
+        self.output=0
     def update(self, error, dt):
-        self.integral+=error*dt
-        derivative=(error-self.prev_error)/dt
-        output=self.kp*error+self.ki*self.integral+self.kd*derivative
+        if dt<=0: return self.output
+        self.derivative+=self.d_alpha*((error-self.prev_error)/dt-self.derivative)
+        integral=_clamp(self.integral+error*dt, self.i_limit)
+        output=self.kp*error+self.ki*integral+self.kd*self.derivative
+        limited=_clamp(output, self.out_limit)
+        if limited==output or (output>0)!=(error>0): self.integral=integral
+        if self.rate_limit is not None:
+            limited=_clamp(limited-self.output, self.rate_limit*dt)+self.output
         self.prev_error=error
-        return output
+        self.output=limited
+        return limited
+
+def _clamp(v, limit):
+    if limit is None: return v
+    return max(-limit, min(limit, v))
@@ -0,0 +1,132 @@
+import queue
+import threading
+import time
+from collections import deque
+
+class DropQueue:
+    # bounded queue where put never blocks: the oldest item is discarded instead
+    # (and handed to on_drop)
+    def __init__(self, maxsize=1, on_drop=None):
+        self.q=queue.Queue(maxsize)
+        self.dropped=0
+        self.on_drop=on_drop
+        self._lock=threading.Lock()
+    def put(self, item):
+        with self._lock:
+            while True:
+                try:
+                    self.q.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        old=self.q.get_nowait()
+                        self.dropped+=1
+                        if self.on_drop: self.on_drop(old)
+                    except queue.Empty: pass
+    def get(self, timeout=None):
+        try: return self.q.get(timeout=timeout)
+        except queue.Empty: return None
+    def __len__(self): return self.q.qsize()
+
+class FramePool:
+    # recycles frame buffers: capture reads into acquire()'s frame and whoever
+    # is last to use a frame release()s it. An empty pool returns None and the
+    # source allocates, so the pool fills up to the number of frames in flight
+    def __init__(self, size=8):
+        self.free=deque(maxlen=size)
+        self.misses=0
+    def acquire(self):
+        try: return self.free.popleft()
+        except IndexError:
+            self.misses+=1
+            return None
+    def release(self, frame):
+        self.free.append(frame)
+
+class StageStats:
+    def __init__(self, name):
+        self.name=name
+        self.count=0
+        self.busy=0.0
+        self.t0=time.monotonic()
+    def record(self, elapsed):
+        self.count+=1
+        self.busy+=elapsed
+    def fps(self):
+        dt=time.monotonic()-self.t0
+        return self.count/dt if dt>0 else 0.0
+    def mean_ms(self):
+        return self.busy/self.count*1000 if self.count else 0.0
+    def as_dict(self):
+        return {"count":self.count, "fps":round(self.fps(),2), "mean_ms":round(self.mean_ms(),2)}
+
+class Pipeline:
+    # capture -> detect -> actuate, each stage on its own thread, joined by
+    # single-slot queues so every stage always works on the newest frame.
+    # With a pool, read(out) fills recycled buffers; frames come back to the
+    # pool when dropped or when the display consumer calls release()
+    def __init__(self, read, detect, actuate, depth=1, pool=None):
+        self.read=read
+        self.detect=detect
+        self.actuate=actuate
+        self.pool=pool
+        self.frames=DropQueue(depth, lambda item: self.release(item[1]))
+        self.results=DropQueue(depth, lambda item: self.release(item[1]))
+        self.display=DropQueue(1, lambda item: self.release(item[0]))
+        self.stats={n:StageStats(n) for n in ("capture","detect","actuate")}
+        self.latency=StageStats("latency")
+        self.error=None
+        self.stop_event=threading.Event()
+        self.threads=[]
+    def _run(self, fn):
+        try:
+            while not self.stop_event.is_set(): fn()
+        except Exception as e:
+            self.error=e
+            self.stop_event.set()
+    def _capture(self):
+        t=time.monotonic()
+        frame=self.read(self.pool.acquire()) if self.pool else self.read()
+        # frame age counts from arrival, not from when the read started waiting
+        ts=time.monotonic()
+        self.stats["capture"].record(ts-t)
+        self.frames.put((ts,frame))
+    def _detect(self):
+        item=self.frames.get(timeout=0.1)
+        if item is None: return
+        ts,frame=item
+        t=time.monotonic()
+        faces=self.detect(frame)
+        self.stats["detect"].record(time.monotonic()-t)
+        self.results.put((ts,frame,faces))
+    def _actuate(self):
+        item=self.results.get(timeout=0.1)
+        if item is None: return
+        ts,frame,faces=item
+        t=time.monotonic()
+        self.actuate(faces, ts)
+        now=time.monotonic()
+        self.stats["actuate"].record(now-t)
+        self.latency.record(now-ts)
+        self.display.put((frame,faces))
+    def release(self, frame):
+        if self.pool: self.pool.release(frame)
+    def start(self):
+        self.stop_event.clear()
+        for name,fn in (("capture",self._capture),("detect",self._detect),("actuate",self._actuate)):
+            th=threading.Thread(target=self._run, args=(fn,), name=f"pipeline-{name}", daemon=True)
+            th.start()
+            self.threads.append(th)
+    def stop(self, timeout=1.0):
+        self.stop_event.set()
+        for th in self.threads: th.join(timeout)
+        self.threads=[]
+    def running(self):
+        return not self.stop_event.is_set()
+    def check(self):
+        if self.error: raise self.error
+    def report(self):
+        r={n:s.as_dict() for n,s in self.stats.items()}
+        r["latency_ms"]=round(self.latency.mean_ms(),2)
+        r["dropped"]={"frames":self.frames.dropped, "results":self.results.dropped}
+        return r
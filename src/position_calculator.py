@@ -1,15 +1,80 @@
+from src.protocol import format_move
+
 class PositionCalculator:
-    def __init__(self, fw, fh, dz=50):
+    # without a pid the step count is a fixed fraction of the offset; with one,
+    # the pid output is a velocity in steps/s and each frame moves output*dt steps.
+    # A motion model makes it aim where the face will be `lead` seconds later.
+    # With tilt=True both axes are driven and commands are two-axis M moves
+    # (positive tilt moves the camera down). The motion model is fed positions
+    # in a world frame: image position plus the pixels the commanded steps have
+    # panned the camera (px_per_step), so the camera's own motion isn't
+    # mistaken for face velocity
+    def __init__(self, fw, fh, dz=50, pid=None, max_steps=200, motion=None, tilt=False, tilt_pid=None, multiplier=0.5,
+                 px_per_step=1.0):
+        self.resize(fw, fh)
+        self.dz=dz
+        self.pid=pid
+        self.max_steps=max_steps
+        self.motion=motion
+        self.tilt=tilt
+        self.tilt_pid=tilt_pid
+        self.multiplier=multiplier
+        self.px_per_step=px_per_step
+        self.cam=(0.0, 0.0)
+    def resize(self, fw, fh):
         self.fw=fw
         self.fh=fh
-        self.dz=dz
         self.cx=fw//2
+        self.cy=fh//2
     def calculate_offset(self, bbox):
         x,y,w,h=bbox
         return (x+w//2)-self.cx
+    def calculate_offset_xy(self, bbox):
+        x,y,w,h=bbox
+        return (x+w//2)-self.cx, (y+h//2)-self.cy
     def needs_adjustment(self, off):
         return abs(off)>self.dz
     def calculate_steps(self, off, m=0.5, ms=200):
         return min(int(abs(off)*m), ms)
+    def calculate_pid_steps(self, off, dt, pid=None):
+        pid=pid or self.pid
+        if not self.needs_adjustment(off):
+            pid.reset()
+            return 0
+        out=int(round(pid.update(off, dt)*dt))
+        return max(-self.max_steps, min(self.max_steps, out))
+    def axis_steps(self, off, pid, dt):
+        # signed steps for one axis
+        if pid is not None: return self.calculate_pid_steps(off, dt, pid)
+        if not self.needs_adjustment(off): return 0
+        steps=self.calculate_steps(off, self.multiplier, self.max_steps)
+        return -steps if off<0 else steps
     def get_direction(self, off):
         return "L" if off<0 else "R"
+    def _shift(self, bbox, sign):
+        x,y,w,h=bbox
+        return (int(round(x+sign*self.cam[0])), int(round(y+sign*self.cam[1])), w, h)
+    def command(self, bbox, dt=None, lead=0.0):
+        if self.motion:
+            bbox=self.motion.step(self._shift(bbox, 1) if bbox else None, dt or 0.0, lead)
+            if bbox: bbox=self._shift(bbox, -1)
+        if bbox is None:
+            self.reset()
+            return None
+        if self.tilt:
+            ox,oy=self.calculate_offset_xy(bbox)
+            pan=self.axis_steps(ox, self.pid, dt)
+            tilt=self.axis_steps(oy, self.tilt_pid, dt)
+            self._moved(pan, tilt)
+            return format_move(pan, tilt) if pan or tilt else None
+        steps=self.axis_steps(self.calculate_offset(bbox), self.pid, dt)
+        self._moved(steps, 0)
+        if not steps: return None
+        return f"{self.get_direction(steps)}{abs(steps):03d}"
+    def _moved(self, pan, tilt):
+        if self.motion: self.cam=(self.cam[0]+pan*self.px_per_step, self.cam[1]+tilt*self.px_per_step)
+    def reset(self):
+        if self.pid: self.pid.reset()
+        if self.tilt_pid: self.tilt_pid.reset()
+        if self.motion: self.motion.reset()
+        self.cam=(0.0, 0.0)
@@ -0,0 +1,44 @@
+import struct
+from src.constants import ACK_OK, ACK_SYNC, CMD_LEFT, CMD_MOVE, CMD_RIGHT, CMD_STOP, PACKET_SYNC
+
+# move packet: sync, seq, pan steps (i16), tilt steps (i16), speed in steps/s (u16),
+# xor checksum of everything before it; speed 0 means stop. Ack: sync, seq, status
+MOVE=struct.Struct("<BBhhH")
+PACKET_SIZE=MOVE.size+1
+ACK_SIZE=3
+INT16=32767
+
+def checksum(data):
+    c=0
+    for b in data: c^=b
+    return c
+
+def format_move(pan, tilt, speed=0):
+    return f"{CMD_MOVE}{pan},{tilt},{speed}"
+
+def parse_command(cmd):
+    # text command -> (pan, tilt, speed); speed 0 leaves the firmware default
+    if cmd[:1]==CMD_LEFT: return -int(cmd[1:]),0,0
+    if cmd[:1]==CMD_RIGHT: return int(cmd[1:]),0,0
+    if cmd[:1]==CMD_MOVE:
+        pan,tilt,speed=(int(v) for v in cmd[1:].split(","))
+        return pan,tilt,speed
+    if cmd==CMD_STOP: return 0,0,0
+    raise ValueError(f"unknown command {cmd!r}")
+
+def encode(cmd, seq, default_speed=500):
+    pan,tilt,speed=parse_command(cmd)
+    if cmd==CMD_STOP: speed=0
+    elif not speed: speed=default_speed
+    clamp=lambda v: max(-INT16, min(INT16, v))
+    body=MOVE.pack(PACKET_SYNC, seq&0xFF, clamp(pan), clamp(tilt), min(speed, 0xFFFF))
+    return body+bytes([checksum(body)])
+
+def decode(packet):
+    if len(packet)!=PACKET_SIZE or packet[0]!=PACKET_SYNC: raise ValueError("bad frame")
+    if checksum(packet[:-1])!=packet[-1]: raise ValueError("bad checksum")
+    _,seq,pan,tilt,speed=MOVE.unpack(packet[:-1])
+    return seq,pan,tilt,speed
+
+def encode_ack(seq, status=ACK_OK):
+    return bytes([ACK_SYNC, seq&0xFF, status])
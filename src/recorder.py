@@ -1,7 +1,98 @@
+import os
+import threading
+import time
+from collections import deque
 import cv2
+from src.logger import setup_logger
+from src.pipeline import DropQueue
+
+log=setup_logger(__name__)
+
 class Recorder:
     def __init__(self, fname, fps=30, size=(640,480)):
         fourcc=cv2.VideoWriter_fourcc(*"XVID")
         self.writer=cv2.VideoWriter(fname, fourcc, fps, size)
     def write(self, frame): self.writer.write(frame)
     def release(self): self.writer.release()
+
+class AsyncRecorder:
+    # write() only copies the frame into a bounded ring; a background thread
+    # encodes it, dropping the oldest frames when the encoder falls behind.
+    # Segments rotate after segment_seconds or segment_bytes. In event mode only
+    # frames with a face (plus preroll/postroll seconds around them) hit disk
+    def __init__(self, path, fps=30, size=(640,480), buffer=60, segment_seconds=None, segment_bytes=None,
+                 event=False, preroll=2.0, postroll=2.0, writer_factory=None):
+        self.base,self.ext=os.path.splitext(path)
+        self.ext=self.ext or ".avi"
+        self.fps=fps
+        self.size=size
+        self.queue=DropQueue(buffer)
+        self.segment_seconds=segment_seconds
+        self.segment_bytes=segment_bytes
+        self.event=event
+        self.preroll=deque(maxlen=max(1,int(preroll*fps)))
+        self.postroll=postroll
+        self.writer_factory=writer_factory or self._open_writer
+        self.writer=None
+        self.segment=None
+        self.segment_start=0.0
+        self.last_face=None
+        self.segments=[]
+        self.written=0
+        self.segment_frames=0
+        self.stop_event=threading.Event()
+        self.thread=None
+    @property
+    def dropped(self): return self.queue.dropped
+    def _open_writer(self, fname):
+        return cv2.VideoWriter(fname, cv2.VideoWriter_fourcc(*"XVID"), self.fps, self.size)
+    def start(self):
+        d=os.path.dirname(self.base)
+        if d: os.makedirs(d, exist_ok=True)
+        self.thread=threading.Thread(target=self._run, name="recorder", daemon=True)
+        self.thread.start()
+    def write(self, frame, face=True):
+        self.queue.put((frame.copy(), face, time.monotonic()))
+    def _run(self):
+        while not self.stop_event.is_set() or len(self.queue):
+            item=self.queue.get(timeout=0.1)
+            if item is not None: self._handle(*item)
+        self._close_segment()
+    def _handle(self, frame, face, ts):
+        if not self.event:
+            self._emit(frame, ts)
+            return
+        if face: self.last_face=ts
+        active=self.last_face is not None and ts-self.last_face<=self.postroll
+        if not active:
+            self._close_segment()
+            self.preroll.append((frame,ts))
+            return
+        while self.preroll: self._emit(*self.preroll.popleft())
+        self._emit(frame, ts)
+    def _emit(self, frame, ts):
+        if self.writer is None or self._should_rotate(ts):
+            self._close_segment()
+            self.segment=f"{self.base}_{time.strftime('%Y%m%d_%H%M%S')}_{len(self.segments):04d}{self.ext}"
+            self.writer=self.writer_factory(self.segment)
+            self.segment_start=ts
+            self.segment_frames=0
+            self.segments.append(self.segment)
+        self.writer.write(frame)
+        self.written+=1
+        self.segment_frames+=1
+    def _should_rotate(self, ts):
+        if self.segment_seconds and ts-self.segment_start>=self.segment_seconds: return True
+        # the file size is polled about once a second; fps may be fractional (29.97)
+        if self.segment_bytes and self.segment_frames%max(1,int(self.fps))==0 and os.path.exists(self.segment):
+            return os.path.getsize(self.segment)>=self.segment_bytes
+        return False
+    def _close_segment(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer=None
+            log.info("recorded %s", self.segment)
+    def release(self):
+        self.stop_event.set()
+        if self.thread: self.thread.join(5.0)
+        if self.queue.dropped: log.warning("recorder dropped %d frames", self.queue.dropped)
@@ -0,0 +1,55 @@
+import threading
+import time
+import cv2
+from src.metrics import metrics
+from src.pipeline import DropQueue
+
+class Renderer:
+    # display consumer off the control path: the loop only hands over every
+    # `every`-th frame (at most max_fps per second); drawing, imshow and waitKey
+    # all run on the renderer's own thread. Pressing q calls on_quit
+    def __init__(self, every=1, max_fps=30, window="Tracker", on_quit=None):
+        self.every=max(1,every)
+        self.min_interval=1/max_fps if max_fps else 0.0
+        self.window=window
+        self.on_quit=on_quit
+        self.slot=DropQueue(1)
+        self.n=0
+        self.last=0.0
+        self.stats={"submitted":0, "queued":0, "shown":0}
+        self.stop_event=threading.Event()
+        self.thread=None
+    def submit(self, frame, faces):
+        self.n+=1
+        self.stats["submitted"]+=1
+        if self.n%self.every: return
+        now=time.monotonic()
+        if now-self.last<self.min_interval: return
+        self.last=now
+        self.stats["queued"]+=1
+        self.slot.put((frame.copy(), faces))
+    def draw(self, frame, faces):
+        if faces:
+            x,y,w,h=faces[0]
+            cv2.rectangle(frame,(x,y),(x+w,y+h),(0,255,0),2)
+        return frame
+    def _run(self):
+        try:
+            while not self.stop_event.is_set():
+                item=self.slot.get(timeout=0.1)
+                if item is None: continue
+                with metrics.timer("display"):
+                    cv2.imshow(self.window, self.draw(*item))
+                    key=cv2.waitKey(1)&0xFF
+                self.stats["shown"]+=1
+                if key==ord("q") and self.on_quit: self.on_quit()
+        finally: cv2.destroyAllWindows()
+    def start(self):
+        self.stop_event.clear()
+        self.thread=threading.Thread(target=self._run, name="renderer", daemon=True)
+        self.thread.start()
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(1.0)
+            self.thread=None
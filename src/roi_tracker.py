@@ -0,0 +1,65 @@
+import cv2
+from src.tracker_utils import expand_bbox
+
+class TemplateTracker:
+    # follows a face between detections by template matching inside a window
+    # around the last bbox; only that window is converted to grayscale
+    def __init__(self, margin=0.5):
+        self.margin=margin
+        self.template=None
+        self.bbox=None
+    def init(self, frame, bbox):
+        x,y,w,h=bbox
+        fh,fw=frame.shape[:2]
+        x,y=max(0,x),max(0,y)
+        w,h=min(w,fw-x),min(h,fh-y)
+        if w<4 or h<4:
+            self.template=None
+            return
+        self.template=cv2.cvtColor(frame[y:y+h,x:x+w], cv2.COLOR_BGR2GRAY)
+        self.bbox=(x,y,w,h)
+    def update(self, frame):
+        if self.template is None: return None,0.0
+        fh,fw=frame.shape[:2]
+        x0,y0,x1,y1=expand_bbox(self.bbox, self.margin, fw, fh)
+        th,tw=self.template.shape
+        if x1-x0<tw or y1-y0<th: return None,0.0
+        win=cv2.cvtColor(frame[y0:y1,x0:x1], cv2.COLOR_BGR2GRAY)
+        res=cv2.matchTemplate(win, self.template, cv2.TM_CCOEFF_NORMED)
+        _,score,_,loc=cv2.minMaxLoc(res)
+        self.bbox=(x0+loc[0], y0+loc[1], tw, th)
+        return self.bbox,score
+
+class DetectTrackDetector:
+    # runs the full detector every `interval` frames, or as soon as the tracker
+    # confidence drops below `threshold`, and tracks in between. The tracker is
+    # seeded on the first face; a caller choosing among faces calls follow()
+    def __init__(self, detector, interval=5, threshold=0.6, tracker=None):
+        self.detector=detector
+        self.interval=interval
+        self.threshold=threshold
+        self.tracker=tracker or TemplateTracker()
+        self.since=interval
+        self.fresh=False
+        self.stats={"detected":0, "tracked":0}
+    def detect(self, frame, scores=False):
+        self.fresh=False
+        if self.since<self.interval:
+            bbox,score=self.tracker.update(frame)
+            if bbox and score>=self.threshold:
+                self.since+=1
+                self.stats["tracked"]+=1
+                return [bbox+(score,)] if scores else [bbox]
+        faces=self.detector.detect(frame, scores) if scores else self.detector.detect(frame)
+        self.stats["detected"]+=1
+        self.fresh=True
+        if faces:
+            self.tracker.init(frame, faces[0][:4])
+            self.since=1
+        else: self.since=self.interval
+        return faces
+    def follow(self, frame, bbox):
+        # re-seeds the tracker on bbox if this frame came from the detector
+        if self.fresh and bbox!=self.tracker.bbox: self.tracker.init(frame, bbox)
+    def warmup(self, w=640, h=480): self.detector.warmup(w, h)
+    def close(self): self.detector.close()
@@ -1,19 +1,64 @@
-import serial
 import time
+from src.constants import ACK_OK, ACK_SYNC, RESP_ERR, RESP_OK, RESP_READY
 from src.exceptions import SerialException
+from src.logger import setup_logger
+from src.protocol import ACK_SIZE, encode
+
+log=setup_logger(__name__)
 
 class SerialComm:
-    def __init__(self, port, baud=115200, to=1.0):
+    # protocol "text" sends L123\n lines; "binary" sends framed two-axis packets
+    # (see src.protocol) and turns the 3-byte acks back into "OK"/"ERR".
+    # connect() returns as soon as the sketch prints READY, or after ready_timeout
+    # for boards that do not reset when the port opens
+    def __init__(self, port, baud=115200, to=1.0, protocol="text", speed=500, ready_timeout=3.0):
         self.port=port
         self.baud=baud
         self.to=to
+        self.protocol=protocol
+        self.speed=speed
+        self.ready_timeout=ready_timeout
+        self.seq=0
         self.ser=None
     def connect(self):
+        import serial
         self.ser=serial.Serial(self.port, self.baud, timeout=self.to)
-        time.sleep(2)
-    def send_command(self, cmd):
+        if not self.wait_ready(): log.warning("no %s from %s after %.1fs, assuming the sketch is running", RESP_READY, self.port, self.ready_timeout)
+        if self.protocol=="binary": self.ser.reset_input_buffer()
+    def wait_ready(self):
+        # skips bootloader noise until the READY line
+        deadline=time.monotonic()+self.ready_timeout
+        try:
+            while True:
+                left=deadline-time.monotonic()
+                if left<=0: return False
+                self.ser.timeout=min(left, self.to)
+                if self.ser.readline().decode(errors="ignore").strip()==RESP_READY: return True
+        finally: self.ser.timeout=self.to
+    def _check(self):
         if not self.ser or not self.ser.is_open: raise SerialException("Not open")
-        self.ser.write(f"{cmd}\n".encode())
-        return self.ser.readline().decode().strip()
+    def write_line(self, cmd):
+        self._check()
+        if self.protocol=="binary":
+            self.ser.write(encode(cmd, self.seq, self.speed))
+            self.seq=(self.seq+1)&0xFF
+        else: self.ser.write(f"{cmd}\n".encode())
+    def read_line(self):
+        return self.read_ack()[0]
+    def read_ack(self):
+        # (response, seq); seq is None for text responses, which carry none
+        self._check()
+        if self.protocol!="binary": return self.ser.readline().decode().strip(),None
+        deadline=time.monotonic()+self.to
+        while time.monotonic()<deadline:
+            b=self.ser.read(1)
+            if b and b[0]==ACK_SYNC:
+                ack=self.ser.read(ACK_SIZE-1)
+                if len(ack)<ACK_SIZE-1: return "",None
+                return RESP_OK if ack[1]==ACK_OK else RESP_ERR,ack[0]
+        return "",None
+    def send_command(self, cmd):
+        self.write_line(cmd)
+        return self.read_line()
     def close(self):
         if self.ser and self.ser.is_open: self.ser.close()
@@ -1,9 +1,114 @@
+import math
+import threading
+import time
+from collections import deque
+from src.constants import CMD_DELTA, CMD_HALT, CMD_POSITION, CMD_TARGET, CMD_VELOCITY, RESP_OK
+from src.protocol import parse_command
+
+STREAM_CMDS=(CMD_DELTA, CMD_TARGET, CMD_VELOCITY, CMD_HALT, CMD_POSITION)
+
+class TrapezoidAxis:
+    # same profile as the sketch's streaming mode: accelerate towards max_speed,
+    # brake in time to stop on the target; targets may change mid-move.
+    # step_rate models the sketch's loop rate: it emits at most one step per
+    # pass, so a profile faster than that lags behind instead of being followed
+    def __init__(self, max_speed=2000.0, accel=8000.0, step_rate=None):
+        self.max_speed=max_speed
+        self.accel=accel
+        self.step_rate=step_rate
+        self.pos=0.0
+        self.v=0.0
+        self.target=0.0
+        self.jog=None
+    def set_target(self, target):
+        self.target=target
+        self.jog=None
+    def set_velocity(self, v):
+        self.jog=max(-self.max_speed, min(self.max_speed, v))
+    def halt(self):
+        # stop as soon as the deceleration allows
+        self.set_target(self.pos+math.copysign(self.v*self.v/(2*self.accel), self.v))
+    def advance(self, dt, tick=0.001):
+        if self.jog is None and self.v==0.0 and self.pos==self.target: return
+        while dt>1e-9:
+            h=min(tick, dt)
+            dt-=h
+            if self.jog is not None: desired=self.jog
+            else:
+                d=self.target-self.pos
+                if abs(d)<0.5 and abs(self.v)<=self.accel*h:
+                    self.pos,self.v=self.target,0.0
+                    continue
+                desired=math.copysign(min(self.max_speed, math.sqrt(2*self.accel*abs(d))), d)
+            self.v+=max(-self.accel*h, min(self.accel*h, desired-self.v))
+            step=self.v*h
+            if self.step_rate: step=max(-self.step_rate*h, min(self.step_rate*h, step))
+            self.pos+=step
+
 class Simulator:
-    def __init__(self): self.pos=0
+    # models the sketch: commands are executed one after another at step_delay
+    # per step (or at the packet's speed) and only acknowledged once finished;
+    # both axes of an M command move at the same time. Streaming commands
+    # (D/T/V/H/P) are acknowledged at once while the axes follow trapezoidal
+    # profiles in (injectable) wall-clock time
+    def __init__(self, step_delay=0.002, to=1.0, verbose=True, max_speed=2000.0, accel=8000.0, clock=time.monotonic,
+                 step_rate=None):
+        self.axes=[TrapezoidAxis(max_speed, accel, step_rate), TrapezoidAxis(max_speed, accel, step_rate)]
+        self.clock=clock
+        self.t=clock()
+        self.step_delay=step_delay
+        self.to=to
+        self.verbose=verbose
+        self.rx=deque()
+        self.cond=threading.Condition()
+    @property
+    def pos(self): return self.position()[0]
+    @property
+    def tilt(self): return self.position()[1]
+    def position(self):
+        self.advance()
+        return tuple(int(round(a.pos)) for a in self.axes)
+    def advance(self):
+        now=self.clock()
+        for a in self.axes: a.advance(now-self.t)
+        self.t=now
     def connect(self): pass
+    def write_line(self, cmd):
+        with self.cond:
+            self.rx.append(cmd)
+            self.cond.notify()
+    def read_line(self):
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.rx, self.to): return ""
+            cmd=self.rx.popleft()
+        return self.execute(cmd)
+    def execute(self, cmd):
+        if cmd[:1] in STREAM_CMDS: return self.execute_stream(cmd)
+        pan,tilt,speed=parse_command(cmd)
+        steps=max(abs(pan),abs(tilt))
+        delay=1/speed if speed else self.step_delay
+        if self.step_delay and steps: time.sleep(steps*delay)
+        self.advance()
+        for a,d in zip(self.axes,(pan,tilt)):
+            a.pos+=d
+            a.target=a.pos
+        if self.verbose: print(f"[SIM] {cmd} -> pos={self.pos} tilt={self.tilt}")
+        return RESP_OK
+    def execute_stream(self, cmd):
+        self.advance()
+        args=[int(v) for v in cmd[1:].split(",")] if len(cmd)>1 else []
+        if cmd[0]==CMD_DELTA:
+            for a,d in zip(self.axes,args): a.set_target(round(a.pos)+d)
+        elif cmd[0]==CMD_TARGET:
+            for a,t in zip(self.axes,args): a.set_target(t)
+        elif cmd[0]==CMD_VELOCITY:
+            for a,v in zip(self.axes,args): a.set_velocity(v)
+        elif cmd[0]==CMD_HALT:
+            for a in self.axes: a.halt()
+        if self.verbose: print(f"[SIM] {cmd} -> pos={self.pos} tilt={self.tilt}")
+        if cmd[0]==CMD_POSITION: return "{}{},{}".format(CMD_POSITION, *self.position())
+        return RESP_OK
     def send_command(self, cmd):
-        if cmd.startswith("L"): self.pos-=int(cmd[1:])
-        elif cmd.startswith("R"): self.pos+=int(cmd[1:])
-        print(f"[SIM] {cmd} -> pos={self.pos}")
-        return "OK"
+        self.write_line(cmd)
+        return self.read_line()
     def close(self): pass
@@ -0,0 +1,80 @@
+import itertools
+import math
+
+def iou(a, b):
+    ax,ay,aw,ah=a[:4]
+    bx,by,bw,bh=b[:4]
+    iw=max(0, min(ax+aw, bx+bw)-max(ax, bx))
+    ih=max(0, min(ay+ah, by+bh)-max(ay, by))
+    inter=iw*ih
+    union=aw*ah+bw*bh-inter
+    return inter/union if union>0 else 0.0
+
+class Track:
+    def __init__(self, tid, det):
+        self.id=tid
+        self.misses=0
+        self.hits=0
+        self.update(det)
+    def update(self, det):
+        self.bbox=tuple(det[:4])
+        self.score=det[4] if len(det)>4 else 1.0
+        self.misses=0
+        self.hits+=1
+
+class FaceAssociator:
+    # greedy IoU matching of detections to existing tracks; a track survives
+    # max_misses frames without a match before its id is retired
+    def __init__(self, iou_threshold=0.3, max_misses=5):
+        self.iou_threshold=iou_threshold
+        self.max_misses=max_misses
+        self.tracks=[]
+        self.ids=itertools.count(1)
+    def update(self, detections):
+        pairs=sorted(((iou(t.bbox,d),ti,di) for ti,t in enumerate(self.tracks) for di,d in enumerate(detections)), reverse=True)
+        used_t,used_d=set(),set()
+        for overlap,ti,di in pairs:
+            if overlap<self.iou_threshold: break
+            if ti in used_t or di in used_d: continue
+            self.tracks[ti].update(detections[di])
+            used_t.add(ti)
+            used_d.add(di)
+        for ti,t in enumerate(self.tracks):
+            if ti not in used_t: t.misses+=1
+        self.tracks=[t for t in self.tracks if t.misses<=self.max_misses]
+        for di,d in enumerate(detections):
+            if di not in used_d: self.tracks.append(Track(next(self.ids), d))
+        return [t for t in self.tracks if t.misses==0]
+
+class TargetSelector:
+    # picks one track to follow. The current target is kept unless another
+    # visible track beats it by switch_margin on the policy's key; "sticky"
+    # never switches while the current target is visible
+    POLICIES=("largest","central","confidence","sticky")
+    def __init__(self, fw, fh, policy="sticky", switch_margin=1.5, iou_threshold=0.3, max_misses=5):
+        if policy not in self.POLICIES: raise ValueError(f"unknown target policy {policy!r}")
+        self.resize(fw, fh)
+        self.policy=policy
+        self.switch_margin=switch_margin
+        self.associator=FaceAssociator(iou_threshold, max_misses)
+        self.target=None
+        self.switches=0
+    def resize(self, fw, fh):
+        self.cx,self.cy=fw/2,fh/2
+        self.diag=math.hypot(fw, fh)
+    def key(self, track):
+        x,y,w,h=track.bbox
+        if self.policy=="largest": return w*h
+        if self.policy=="confidence": return track.score
+        # central, and sticky's choice of a new target
+        return 1-math.hypot(x+w/2-self.cx, y+h/2-self.cy)/self.diag
+    def select(self, detections):
+        visible=self.associator.update(detections)
+        if not visible: return None
+        best=max(visible, key=self.key)
+        current=next((t for t in visible if self.target is not None and t.id==self.target), None)
+        if current is not None and (self.policy=="sticky" or self.key(best)<=self.key(current)*self.switch_margin):
+            return current
+        if self.target is not None and best.id!=self.target: self.switches+=1
+        self.target=best.id
+        return best
@@ -10,3 +10,13 @@ def is_in_dead_zone(offset, dz=50):
 
 def calculate_steps(offset, mult=0.5, max_s=200):
     return min(int(abs(offset)*mult), max_s)
+
+def expand_bbox(bbox, margin, fw, fh):
+    x,y,w,h=bbox
+    mx,my=int(w*margin),int(h*margin)
+    return (max(0,x-mx), max(0,y-my), min(fw,x+w+mx), min(fh,y+h+my))
+
+def to_pixels(rel, x0, y0, w, h):
+    # relative (xmin, ymin, width, height) inside a w x h window at (x0, y0) -> frame pixels
+    rx,ry,rw,rh=rel
+    return (x0+int(rx*w), y0+int(ry*h), int(rw*w), int(rh*h))
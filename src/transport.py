@@ -0,0 +1,162 @@
+import threading
+import time
+from collections import deque
+from src.constants import CMD_DELTA, CMD_HALT, CMD_LEFT, CMD_MOVE, CMD_RIGHT, CMD_STOP, RESP_ERR, RESP_OK
+from src.protocol import format_move, parse_command
+from src.logger import setup_logger
+from src.metrics import metrics
+
+log=setup_logger(__name__)
+
+MOVES=(CMD_LEFT,CMD_RIGHT,CMD_MOVE)
+
+def coalesce(cmds):
+    # fold runs of moves into one net move per axis; a stop cancels the moves queued before it
+    out=[]
+    net=None
+    for cmd in cmds:
+        if cmd[:1] in MOVES:
+            pan,tilt,speed=parse_command(cmd)
+            if net is None: net=[0,0,0,False]
+            net[0]+=pan
+            net[1]+=tilt
+            net[2]=speed or net[2]
+            net[3]|=cmd[0]==CMD_MOVE
+            continue
+        if cmd==CMD_STOP:
+            out=[c for c in out if c[:1] not in MOVES]
+        elif net: out.extend(_flush(net))
+        net=None
+        out.append(cmd)
+    if net: out.extend(_flush(net))
+    return out
+
+def latest(cmds):
+    # keep only the newest command; when every command is computed from a fresh
+    # absolute offset the older queued ones are already stale
+    return cmds[-1:]
+
+COALESCERS={"net":coalesce, "latest":latest, None:list}
+
+def _flush(net):
+    pan,tilt,speed,two_axis=net
+    if two_axis: return [format_move(pan, tilt, speed)] if pan or tilt else []
+    return [f"{CMD_LEFT if pan<0 else CMD_RIGHT}{abs(pan):03d}"] if pan else []
+
+class AsyncTransport:
+    # wraps a SerialComm/Simulator: send_command only queues, a writer thread
+    # keeps at most `window` commands in flight and a reader thread matches acks.
+    # Binary acks are matched by sequence number, so an ERR releases its
+    # command at once and a late ack for a timed-out command is ignored
+    def __init__(self, comm, window=1, ack_timeout=2.0, coalescing="net"):
+        self.comm=comm
+        self.window=window
+        self.ack_timeout=ack_timeout
+        self.coalesce=COALESCERS[coalescing]
+        self.pending=[]
+        self.inflight=deque()
+        self.cond=threading.Condition()
+        self.running=False
+        self.threads=[]
+        self.stats={"queued":0, "sent":0, "coalesced":0, "acked":0, "errors":0, "timeouts":0, "rtt_ms":0.0}
+    def connect(self):
+        self.comm.connect()
+        metrics.gauge("serial_queue", lambda: len(self.pending))
+        metrics.gauge("serial_inflight", lambda: len(self.inflight))
+        metrics.gauge("serial_timeouts", lambda: self.stats["timeouts"])
+        self.running=True
+        for fn in (self._writer, self._reader):
+            th=threading.Thread(target=fn, name=f"serial-{fn.__name__[1:]}", daemon=True)
+            th.start()
+            self.threads.append(th)
+    def send_command(self, cmd):
+        with self.cond:
+            self.pending.append(cmd)
+            self.stats["queued"]+=1
+            self.cond.notify_all()
+    def _writer(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: not self.running or (self.pending and len(self.inflight)<self.window))
+                if not self.running: return
+                cmds=self.coalesce(self.pending)
+                self.stats["coalesced"]+=len(self.pending)-len(cmds)
+                if not cmds:
+                    self.pending=[]
+                    continue
+                cmd,self.pending=cmds[0],cmds[1:]
+                # only this thread writes, so the comm's next seq is this command's
+                self.inflight.append((cmd,time.monotonic(),getattr(self.comm, "seq", None)))
+            self.comm.write_line(cmd)
+            self.stats["sent"]+=1
+    def _read(self):
+        if hasattr(self.comm, "read_ack"): return self.comm.read_ack()
+        return self.comm.read_line(),None
+    def _match(self, seq):
+        # index of the in-flight command an ack belongs to; unsequenced acks go to the oldest
+        if seq is None: return 0 if self.inflight else None
+        return next((i for i,entry in enumerate(self.inflight) if entry[2]==seq), None)
+    def _reader(self):
+        while self.running:
+            resp,seq=self._read()
+            now=time.monotonic()
+            with self.cond:
+                if resp in (RESP_OK, RESP_ERR):
+                    i=self._match(seq)
+                    if i is None: log.warning("ignoring %s for seq %s, nothing in flight matches", resp, seq)
+                    else:
+                        for _ in range(i):
+                            cmd,t,_seq=self.inflight.popleft()
+                            self.stats["timeouts"]+=1
+                            log.warning("no ack for %s", cmd)
+                        cmd,t,_seq=self.inflight.popleft()
+                        if resp==RESP_OK:
+                            self.stats["acked"]+=1
+                            self.stats["rtt_ms"]=(now-t)*1000
+                            metrics.observe("serial_rtt", self.stats["rtt_ms"])
+                        else:
+                            self.stats["errors"]+=1
+                            log.warning("%s rejected by the sketch", cmd)
+                elif resp: log.warning("unexpected response %r", resp)
+                elif self.inflight and now-self.inflight[0][1]>self.ack_timeout:
+                    cmd,t,_seq=self.inflight.popleft()
+                    self.stats["timeouts"]+=1
+                    log.warning("no ack for %s", cmd)
+                self.cond.notify_all()
+    def idle(self):
+        return not self.pending and not self.inflight
+    def wait_idle(self, timeout=None):
+        with self.cond: return self.cond.wait_for(self.idle, timeout)
+    def close(self):
+        with self.cond:
+            self.running=False
+            self.cond.notify_all()
+        for th in self.threads: th.join(self.comm.to+0.5)
+        self.threads=[]
+        self.comm.close()
+
+def to_stream(cmd):
+    # relative move -> retarget relative to where the motor is now; stop -> halt
+    if cmd==CMD_STOP: return CMD_HALT
+    pan,tilt,_=parse_command(cmd)
+    return f"{CMD_DELTA}{pan},{tilt}"
+
+class StreamTransport:
+    # for the sketch's non-blocking mode: every move is a D retarget that the
+    # sketch acknowledges at once and blends into the running profile
+    def __init__(self, comm):
+        self.comm=comm
+        self.to=getattr(comm, "to", 1.0)
+        self.stats={"sent":0, "acked":0, "rtt_ms":0.0}
+    def connect(self): self.comm.connect()
+    def send_command(self, cmd):
+        t=time.monotonic()
+        resp=self.comm.send_command(to_stream(cmd))
+        self.stats["sent"]+=1
+        if resp==RESP_OK:
+            self.stats["acked"]+=1
+            self.stats["rtt_ms"]=(time.monotonic()-t)*1000
+            metrics.observe("serial_rtt", self.stats["rtt_ms"])
+        else: log.warning("no ack for %s: %r", cmd, resp)
+        return resp
+    def close(self): self.comm.close()
@@ -1,5 +1,21 @@
-from flask import Flask, render_template
+import threading
+from flask import Flask, Response, jsonify, render_template
+from src.metrics import metrics
+from src.live_view import live_view
 app=Flask(__name__)
 @app.route("/")
 def index(): return render_template("index.html")
+@app.route("/metrics")
+def prometheus(): return Response(metrics.to_prometheus(), mimetype="text/plain; version=0.0.4")
+@app.route("/metrics.json")
+def metrics_json(): return jsonify(metrics.snapshot())
+@app.route("/stream.mjpg")
+def stream(): return Response(live_view.frames(), mimetype="multipart/x-mixed-replace; boundary=frame")
+@app.route("/state")
+def state(): return jsonify(live_view.state)
+def serve_in_background(host="0.0.0.0", port=5000):
+    # run next to the tracker so the endpoints see its in-process metrics
+    th=threading.Thread(target=app.run, kwargs={"host":host, "port":port, "threaded":True, "use_reloader":False}, name="web", daemon=True)
+    th.start()
+    return th
 if __name__=="__main__": app.run(debug=True)
@@ -0,0 +1,47 @@
+import cv2
+import numpy as np
+import pytest
+import src.camera
+from src.camera import Camera
+from src.exceptions import CameraException
+
+class FakeCapture:
+    # a driver that only does 640x480 and records the order of set() calls
+    def __init__(self, idx, api):
+        self.idx,self.api=idx,api
+        self.calls=[]
+        self.props={cv2.CAP_PROP_FRAME_WIDTH:640, cv2.CAP_PROP_FRAME_HEIGHT:480, cv2.CAP_PROP_FPS:30,
+                    cv2.CAP_PROP_FOURCC:cv2.VideoWriter_fourcc(*"YUYV")}
+    def isOpened(self): return True
+    def set(self, prop, value):
+        self.calls.append(prop)
+        if prop in (cv2.CAP_PROP_FOURCC, cv2.CAP_PROP_FPS): self.props[prop]=value
+        return True
+    def get(self, prop): return self.props.get(prop, 0)
+    def read(self, out=None):
+        frame=out if out is not None else np.empty((480,640,3), np.uint8)
+        frame[:]=7
+        return True,frame
+    def release(self): pass
+
+@pytest.fixture
+def fake_capture(monkeypatch):
+    monkeypatch.setattr(src.camera.cv2, "VideoCapture", FakeCapture)
+
+def test_format_is_set_before_size_and_delivered_size_is_kept(fake_capture):
+    cam=Camera("/dev/video0", 1280, 720, fourcc="MJPG", fps=60, buffer_size=1, backend="v4l2")
+    cam.open()
+    assert cam.cap.api==cv2.CAP_V4L2
+    assert cam.cap.calls==[cv2.CAP_PROP_FOURCC, cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT,
+                           cv2.CAP_PROP_FPS, cv2.CAP_PROP_BUFFERSIZE]
+    assert cam.cap.props[cv2.CAP_PROP_FOURCC]==cv2.VideoWriter_fourcc(*"MJPG")
+    assert (cam.w,cam.h)==(640,480)
+
+def test_read_fills_the_given_buffer(fake_capture):
+    cam=Camera(0)
+    cam.open()
+    assert cam.cap.calls==[cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT, cv2.CAP_PROP_BUFFERSIZE]
+    buf=np.zeros((480,640,3), np.uint8)
+    assert cam.read(buf) is buf and buf[0,0,0]==7
+    cam.cap.read=lambda out=None: (False,None)
+    with pytest.raises(CameraException): cam.read()
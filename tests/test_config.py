@@ -0,0 +1,95 @@
+import os
+import pytest
+from src.config import DEFAULTS, Config, ConfigWatcher, load, resolve
+
+@pytest.fixture(autouse=True)
+def restore_config():
+    yield
+    for k,v in DEFAULTS.items(): setattr(Config, k, v)
+
+def write(path, text, bump=0):
+    path.write_text(text)
+    # make sure the watcher sees a new mtime even on coarse filesystems
+    st=os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns+bump*1_000_000_000))
+
+def test_layers_merge_in_order(tmp_path):
+    cfg=tmp_path/"config.yml"
+    write(cfg, "pid:\n  kp: 3\n  ki: 0.2\ntracking:\n  dead_zone: 40\n")
+    values=resolve(cfg, env={"TRACKER_PID_KP":"4", "TRACKER_DEAD_ZONE":"30", "OTHER":"x"}, overrides={"pid.kp":5})
+    assert values["PID_KP"]==5.0
+    assert values["PID_KI"]==0.2
+    assert values["DEAD_ZONE"]==30
+    assert values["MAX_STEPS"]==DEFAULTS["MAX_STEPS"]
+
+def test_values_are_checked_against_defaults(tmp_path):
+    assert resolve(env={"TRACKER_ROI_MARGIN":"0.5", "TRACKER_PREDICT":"true"})["ROI_MARGIN"]==0.5
+    with pytest.raises(ValueError): resolve(env={"TRACKER_DEAD_ZONE":"wide"})
+    with pytest.raises(ValueError): resolve(env={"TRACKER_MAX_STEPS":"2.5"})
+    with pytest.raises(ValueError): resolve(overrides={"pid.kq":1})
+    cfg=tmp_path/"config.yml"
+    write(cfg, "tracking:\n  deadzone: 40\n")
+    with pytest.raises(ValueError): resolve(cfg)
+
+def test_load_sets_config_and_reports_changes(tmp_path):
+    cfg=tmp_path/"config.yml"
+    write(cfg, "camera:\n  width: 1280\n  height: 720\n")
+    assert load(cfg, env={})=={"FRAME_WIDTH":1280, "FRAME_HEIGHT":720}
+    assert Config.FRAME_WIDTH==1280
+    assert load(cfg, env={})=={}
+
+def test_watcher_applies_only_live_keys(tmp_path):
+    cfg=tmp_path/"config.yml"
+    write(cfg, "pid:\n  kp: 3\n")
+    load(cfg, env={}, overrides={"DEAD_ZONE":20})
+    calls=[]
+    watcher=ConfigWatcher(cfg, calls.append, env={}, overrides={"DEAD_ZONE":20})
+    assert watcher.check()=={}
+    write(cfg, "pid:\n  kp: 4\ncamera:\n  width: 1280\ntracking:\n  dead_zone: 80\n", bump=1)
+    assert watcher.check()=={"PID_KP":4.0}
+    assert calls==[{"PID_KP":4.0}]
+    # stored for the next start, overrides still win over the file
+    assert Config.FRAME_WIDTH==1280
+    assert Config.DEAD_ZONE==20
+
+def test_watcher_keeps_values_when_file_is_broken(tmp_path):
+    cfg=tmp_path/"config.yml"
+    write(cfg, "pid:\n  kp: 3\n")
+    load(cfg, env={})
+    watcher=ConfigWatcher(cfg, lambda changed: None, env={})
+    write(cfg, "pid: [kp\n", bump=1)
+    assert watcher.check()=={}
+    assert Config.PID_KP==3.0
+
+def test_modes_and_nullable_numbers_are_validated():
+    for env in ({"TRACKER_SERIAL_MODE":"asnyc"}, {"TRACKER_CONTROL":"PID"}, {"TRACKER_COALESCING":"sum"},
+                {"TRACKER_TARGET_POLICY":"biggest"}, {"TRACKER_CAMERA_FOURCC":"H264"}, {"TRACKER_ROI_MARGIN":"wide"}):
+        with pytest.raises(ValueError): resolve(env=env)
+    values=resolve(env={"TRACKER_TARGET_POLICY":"sticky", "TRACKER_ROI_MARGIN":"0.5", "TRACKER_CAMERA_FPS":"null"})
+    assert (values["TARGET_POLICY"],values["ROI_MARGIN"],values["CAMERA_FPS"])==("sticky",0.5,None)
+
+def test_watcher_survives_bad_values_and_failing_callbacks(tmp_path):
+    cfg=tmp_path/"config.yml"
+    write(cfg, "serial:\n  coalescing: latest\n")
+    load(cfg, env={})
+    calls=[]
+    def on_change(changed):
+        calls.append(changed)
+        raise RuntimeError("apply failed")
+    watcher=ConfigWatcher(cfg, on_change, env={})
+    write(cfg, "serial:\n  coalescing: sum\n", bump=1)
+    assert watcher.check()=={}
+    assert Config.COALESCING=="latest"
+    write(cfg, "serial:\n  coalescing: net\n", bump=2)
+    assert watcher.check()=={"COALESCING":"net"}
+    write(cfg, "serial:\n  coalescing: net\npid:\n  kp: 2\n", bump=3)
+    assert watcher.check()=={"PID_KP":2.0}
+    assert len(calls)==2
+
+def test_float_flags_are_accepted():
+    values=resolve(env={}, overrides={"SEGMENT_SECONDS":2.5, "DISPLAY_FPS":12.5, "ACCEL":7500.5})
+    assert (values["SEGMENT_SECONDS"],values["DISPLAY_FPS"],values["ACCEL"])==(2.5,12.5,7500.5)
+
+def test_stream_mode_rejects_binary_protocol():
+    with pytest.raises(ValueError): resolve(env={}, overrides={"serial_mode":"stream", "protocol":"binary"})
+    assert resolve(env={}, overrides={"serial_mode":"stream"})["SERIAL_PROTOCOL"]=="text"
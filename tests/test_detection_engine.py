@@ -0,0 +1,63 @@
+import os
+import random
+import time
+import numpy as np
+import pytest
+from src.detection_engine import DetectionEngine
+
+class EchoDetector:
+    def detect(self, frame):
+        time.sleep(random.random()*0.01)
+        return [(int(frame[0,0,0]), int(frame[0,0,1]), 1, 1)]
+    def close(self): pass
+
+class CrashDetector(EchoDetector):
+    # takes its whole process down on frame 3
+    def detect(self, frame):
+        if frame[0,0,0]==3: os._exit(1)
+        return super().detect(frame)
+
+def submit_frames(eng, shape, n):
+    for seq in range(n): assert eng.submit(0, seq, np.full(shape, seq, dtype=np.uint8), block=True, timeout=5)
+
+def test_engine_reports_frame_lost_with_its_worker():
+    shape=(8,8,3)
+    with DetectionEngine(workers=2, shape=shape, factory=CrashDetector) as eng:
+        submit_frames(eng, shape, 6)
+        got=[eng.get(timeout=10) for _ in range(6)]
+        assert [seq for _,seq,_ in got]==list(range(6))
+        assert got[3][2] is None and got[4][2]==[(4,4,1,1)]
+        assert eng.stats["failed"]==1
+
+def test_engine_fails_queued_frames_when_no_worker_is_left():
+    shape=(8,8,3)
+    with DetectionEngine(workers=1, shape=shape, slots=6, factory=CrashDetector) as eng:
+        submit_frames(eng, shape, 6)
+        got=[eng.get(timeout=10) for _ in range(6)]
+        assert [faces is None for _,_,faces in got]==[False]*3+[True]*3
+        with pytest.raises(RuntimeError): eng.get(timeout=1)
+        with pytest.raises(RuntimeError): eng.submit(0, 6, np.zeros(shape, dtype=np.uint8))
+
+def test_engine_keeps_per_camera_order():
+    shape=(48,64,3)
+    with DetectionEngine(workers=3, shape=shape, factory=EchoDetector) as eng:
+        for seq in range(20):
+            for cam in range(2):
+                frame=np.full(shape, seq, dtype=np.uint8)
+                frame[0,0,1]=cam
+                assert eng.submit(cam, seq, frame, block=True, timeout=5)
+        got={0:[],1:[]}
+        for _ in range(40):
+            cam,seq,faces=eng.get(timeout=10)
+            assert faces==[(seq,cam,1,1)]
+            got[cam].append(seq)
+    assert got=={0:list(range(20)), 1:list(range(20))}
+
+def test_engine_drops_when_slots_full():
+    shape=(8,8,3)
+    with DetectionEngine(workers=1, shape=shape, slots=1, factory=EchoDetector) as eng:
+        frame=np.zeros(shape, dtype=np.uint8)
+        assert eng.submit(0, 0, frame)
+        assert not eng.submit(0, 1, frame)
+        assert eng.stats["dropped"]==1
+        assert eng.get(timeout=10)[1]==0
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+import numpy as np
+from src.face_detector import FaceDetector
+
+class FakeGraph:
+    # stands in for MediaPipe: reports bright pixels as one face per connected
+    # column band, in relative coordinates of the image it is given
+    def __init__(self, score=0.9):
+        self.score=score
+        self.shapes=[]
+    def process(self, rgb):
+        self.shapes.append(rgb.shape[:2])
+        h,w=rgb.shape[:2]
+        ys,xs=np.nonzero(rgb[:,:,0]>200)
+        if not len(xs): return SimpleNamespace(detections=None)
+        box=SimpleNamespace(xmin=xs.min()/w, ymin=ys.min()/h, width=(xs.max()+1-xs.min())/w, height=(ys.max()+1-ys.min())/h)
+        return SimpleNamespace(detections=[SimpleNamespace(location_data=SimpleNamespace(relative_bounding_box=box), score=[self.score])])
+    def close(self): pass
+
+def face_frame(x, y, size=40, shape=(240,320)):
+    frame=np.zeros(shape+(3,), dtype=np.uint8)
+    frame[y:y+size,x:x+size]=255
+    return frame
+
+def make_detector(**kw):
+    det=FaceDetector(**kw)
+    det.detector=FakeGraph()
+    return det
+
+def test_detect_returns_scores_on_request():
+    det=make_detector()
+    assert det.detect(face_frame(100,60))==[(100,60,40,40)]
+    assert det.detect(face_frame(100,60), scores=True)==[(100,60,40,40,0.9)]
+
+def test_roi_hit_is_remapped_to_frame_pixels():
+    det=make_detector(roi_margin=0.5)
+    det.detect(face_frame(100,60))
+    assert det.detect(face_frame(110,64))==[(110,64,40,40)]
+    assert det.stats=={"roi":1, "full":1}
+    assert det.detector.shapes[-1][0]<240 and det.detector.shapes[-1][1]<320
+
+def test_roi_miss_falls_back_to_full_frame():
+    det=make_detector(roi_margin=0.5)
+    det.detect(face_frame(100,60))
+    assert det.detect(face_frame(250,170))==[(250,170,40,40)]
+    assert det.stats=={"roi":0, "full":2}
+    assert det.detector.shapes[-1]==(240,320)
+
+def test_downscaled_detection_reports_full_frame_coordinates():
+    det=make_detector(scale=0.5)
+    (x,y,w,h),=det.detect(face_frame(100,60))
+    assert det.detector.shapes==[(120,160)]
+    assert max(abs(x-100),abs(y-60),abs(w-40),abs(h-40))<=2
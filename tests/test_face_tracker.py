@@ -0,0 +1,128 @@
+import threading
+from types import SimpleNamespace
+import time
+import numpy as np
+from src.config import DEFAULTS, Config
+from src.face_detector import FaceDetector
+from src.face_tracker import FaceTracker
+from src.frame_source import SyntheticSource
+from src.roi_tracker import DetectTrackDetector
+from src.simulator import Simulator
+
+class SlowPhase:
+    # records which phases were running at the same time
+    def __init__(self):
+        self.running=set()
+        self.overlap=set()
+        self.lock=threading.Lock()
+    def __call__(self, name, delay=0.2):
+        with self.lock:
+            self.running.add(name)
+            if len(self.running)>1: self.overlap.update(self.running)
+        time.sleep(delay)
+        with self.lock: self.running.discard(name)
+
+class FakeDetector:
+    def __init__(self, phase): self.phase=phase
+    def warmup(self, w, h): self.phase("detector")
+    def detect(self, frame, scores=False): return []
+    def close(self): pass
+
+def make_tracker(**kw):
+    return FaceTracker(sim=True, camera=SyntheticSource(160, 120), comm=Simulator(0, verbose=False), display=False, **kw)
+
+def test_startup_phases_run_in_parallel():
+    phase=SlowPhase()
+    tracker=make_tracker(max_frames=1)
+    camera_open=tracker.camera.open
+    tracker.camera.open=lambda: (phase("camera"), camera_open())
+    tracker.comm.connect=lambda: phase("serial")
+    tracker.detector=FakeDetector(phase)
+    tracker.start()
+    assert phase.overlap=={"camera", "serial", "detector"}
+    assert set(tracker.startup_ms)=={"camera", "serial", "detector", "total"}
+    assert tracker.startup_ms["total"]<2*200
+
+def test_stop_requested_during_startup_is_kept():
+    tracker=make_tracker()
+    tracker.comm.connect=tracker.request_stop
+    tracker.detector=FakeDetector(lambda name: None)
+    tracker.start()
+    assert tracker.stats["frames"]==0 and not tracker.running
+
+def test_apply_config_updates_running_tracker():
+    try:
+        tracker=make_tracker(control="pid")
+        Config.PID_KP,Config.DEAD_ZONE,Config.STEP_MULTIPLIER,Config.DETECT_INTERVAL=3.0,20,0.8,4
+        tracker.apply_config()
+        assert tracker.calc.pid.kp==3.0
+        assert (tracker.calc.dz,tracker.calc.multiplier)==(20,0.8)
+        assert isinstance(tracker.detector, DetectTrackDetector) and tracker.detector.interval==4
+    finally:
+        for k,v in DEFAULTS.items(): setattr(Config, k, v)
+
+class TwoFaces:
+    # two fixed faces, listed in a different order on every call
+    def __init__(self): self.calls=0
+    def detect(self, frame, scores=False):
+        self.calls+=1
+        faces=[(40,60,40,40,0.9), (220,60,40,40,0.8)]
+        if self.calls%2: faces.reverse()
+        return faces if scores else [f[:4] for f in faces]
+    def close(self): pass
+
+def two_face_frame():
+    rng=np.random.default_rng(1)
+    frame=np.zeros((160,320,3), dtype=np.uint8)
+    for x in (40,220): frame[60:100,x:x+40]=rng.integers(0,255,(40,40,3), dtype=np.uint8)
+    return frame
+
+def test_detect_puts_target_first():
+    tracker=make_tracker(target_policy="confidence", detect_interval=1)
+    tracker.detector=TwoFaces()
+    frame=two_face_frame()
+    for _ in range(4): assert tracker.detect(frame)[0]==(40,60,40,40)
+
+def test_tracking_between_detections_follows_the_target():
+    tracker=make_tracker(target_policy="sticky", detect_interval=5)
+    tracker.detector.detector=TwoFaces()
+    frame=two_face_frame()
+    targets={tracker.detect(frame)[0] for _ in range(20)}
+    assert len(targets)==1
+    assert tracker.selector.switches==0
+    assert tracker.detector.stats["tracked"]>0
+
+class BandGraph:
+    # MediaPipe stand-in: one face per bright column band, narrow faces listed
+    # first, score grows with width
+    def process(self, rgb):
+        h,w=rgb.shape[:2]
+        cols=np.flatnonzero((rgb[:,:,0]>0).any(axis=0))
+        bands=np.split(cols, np.flatnonzero(np.diff(cols)>1)+1) if len(cols) else []
+        dets=[]
+        for b in sorted(bands, key=len):
+            ys=np.flatnonzero((rgb[:,b[0],0]>0))
+            box=SimpleNamespace(xmin=b[0]/w, ymin=ys[0]/h, width=len(b)/w, height=len(ys)/h)
+            dets.append(SimpleNamespace(location_data=SimpleNamespace(relative_bounding_box=box), score=[0.5+len(b)/100]))
+        return SimpleNamespace(detections=dets or None)
+    def close(self): pass
+
+def test_roi_search_follows_the_target():
+    tracker=make_tracker(target_policy="confidence", detect_interval=1)
+    tracker.detector=FaceDetector(roi_margin=0.3)
+    tracker.detector.detector=BandGraph()
+    frame=np.zeros((160,320,3), dtype=np.uint8)
+    frame[60:100,40:80]=255
+    frame[60:90,220:250]=255
+    for _ in range(3): assert tracker.detect(frame)[0]==(40,60,40,40)
+    assert tracker.detector.stats["roi"]==2
+
+def test_geometry_follows_delivered_frame_size():
+    recorder=SimpleNamespace(size=(Config.FRAME_WIDTH,Config.FRAME_HEIGHT), start=lambda: None, write=lambda *a: None,
+                             release=lambda: None, dropped=0)
+    tracker=make_tracker(target_policy="central", max_frames=1, recorder=recorder)
+    tracker.detector=SimpleNamespace(warmup=lambda w, h: None, detect=lambda frame, scores=False: [], close=lambda: None)
+    tracker.start()
+    assert (tracker.calc.cx,tracker.calc.cy)==(80,60)
+    assert (tracker.selector.cx,tracker.selector.cy)==(80,60)
+    assert recorder.size==(160,120)
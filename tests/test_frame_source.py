@@ -0,0 +1,46 @@
+import cv2
+import numpy as np
+import pytest
+from src.camera import Camera
+from src.exceptions import CameraException
+from src.frame_source import ImageDirSource, SyntheticSource, VideoFileSource, make_source
+
+def test_synthetic_source_moves_face():
+    src=SyntheticSource(320,240)
+    src.open()
+    a,b=src.read(),src.read()
+    assert a.shape==(240,320,3)
+    assert not np.array_equal(a,b)
+    src.release()
+    with pytest.raises(CameraException): src.read()
+
+def test_sources_read_into_the_given_buffer(tmp_path):
+    writer=cv2.VideoWriter(str(tmp_path/"clip.avi"), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64,48))
+    for i in range(3):
+        writer.write(np.full((48,64,3), 60*i, np.uint8))
+        cv2.imwrite(str(tmp_path/f"{i:03d}.png"), np.full((48,64,3), 60*i, np.uint8))
+    writer.release()
+    for src in (SyntheticSource(64,48), VideoFileSource(str(tmp_path/"clip.avi")), VideoFileSource(str(tmp_path/"clip.avi"), 32, 24),
+                ImageDirSource(str(tmp_path)), ImageDirSource(str(tmp_path), 32, 24)):
+        src.open()
+        first=src.read()
+        assert first.shape==(src.h,src.w,3)
+        assert src.read(first) is first
+        src.release()
+
+def test_image_dir_source_plays_in_order_and_loops(tmp_path):
+    for i in (2,0,1): cv2.imwrite(str(tmp_path/f"{i}.png"), np.full((8,8,3), i, np.uint8))
+    src=ImageDirSource(str(tmp_path))
+    src.open()
+    assert [int(src.read()[0,0,0]) for _ in range(4)]==[0,1,2,0]
+    src.loop=False
+    src.i=3
+    with pytest.raises(CameraException): src.read()
+
+def test_make_source_picks_backend(tmp_path):
+    assert isinstance(make_source(0), Camera)
+    assert make_source("/dev/video2").backend=="v4l2"
+    assert isinstance(make_source("synthetic"), SyntheticSource)
+    assert isinstance(make_source(str(tmp_path)), ImageDirSource)
+    assert isinstance(make_source(str(tmp_path/"clip.mp4")), VideoFileSource)
+    with pytest.raises(ValueError): Camera(fourcc="MJPEG")
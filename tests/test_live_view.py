@@ -0,0 +1,38 @@
+import threading
+import time
+import numpy as np
+from src.live_view import LiveView
+
+def test_publish_is_free_without_viewers():
+    lv=LiveView()
+    lv.publish(np.zeros((4,4,3), dtype=np.uint8), [])
+    assert lv.pending is None
+
+def test_viewers_share_one_encode_and_skip_frames():
+    lv=LiveView(max_fps=1000)
+    clients=[lv.frames(timeout=2) for _ in range(2)]
+    got=[]
+    threads=[threading.Thread(target=lambda c=c: got.append(next(c))) for c in clients]
+    for t in threads: t.start()
+    while lv.viewers<2: time.sleep(0.001)
+    frame=np.zeros((48,64,3), dtype=np.uint8)
+    lv.publish(frame, [(1,1,10,10)])
+    for t in threads: t.join(2)
+    assert len(got)==2 and got[0]==got[1] and b"image/jpeg" in got[0]
+    for i in range(5):
+        frame[:]=i*40
+        lv.publish(frame, [])
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert lv.seq>1
+    latest=next(clients[0])
+    assert latest.endswith(lv.jpeg+b"\r\n")
+    for c in clients: c.close()
+    lv.close()
+    assert lv.viewers==0
+
+def test_backs_off_when_encoding_is_slow():
+    lv=LiveView(max_fps=20, quality=80, min_quality=30)
+    for _ in range(10): lv._adapt(1.0)
+    assert lv.quality==30
+    assert lv.fps<20
@@ -0,0 +1,30 @@
+from src.metrics import Histogram, Metrics
+
+def test_histogram_quantiles():
+    h=Histogram()
+    for ms in [0.8]*90+[40]*9+[700]: h.observe(ms)
+    assert h.quantile(0.5)==1
+    assert h.quantile(0.95)==50
+    assert h.quantile(0.999)==1000
+    assert h.max==700
+
+def test_registry_snapshot_and_prometheus():
+    m=Metrics()
+    with m.timer("detect"): pass
+    m.inc("commands", 3)
+    m.gauge("frames_dropped", lambda: 7)
+    snap=m.snapshot()
+    assert snap["timings"]["detect"]["count"]==1
+    assert snap["counters"]["commands"]==3
+    text=m.to_prometheus()
+    assert 'tracker_detect_ms_bucket{le="+Inf"} 1' in text
+    assert "tracker_commands_total 3" in text
+    assert "tracker_frames_dropped 7" in text
+
+def test_metrics_endpoints():
+    from src.metrics import metrics
+    from src.web.app import app
+    metrics.inc("commands")
+    client=app.test_client()
+    assert "tracker_commands_total" in client.get("/metrics").get_data(as_text=True)
+    assert "commands" in client.get("/metrics.json").get_json()["counters"]
@@ -0,0 +1,62 @@
+import random
+from src.motion_model import KalmanTracker
+from src.position_calculator import PositionCalculator
+from src.simulator import Simulator
+
+def center(b): return b[0]+b[2]/2
+
+def test_predicts_ahead_of_moving_face():
+    kf=KalmanTracker()
+    dt=1/30
+    for i in range(60): kf.step((100+int(300*i*dt),200,40,40), dt)
+    aimed=kf.aim(0.2)
+    assert abs(center(aimed)-(120+300*(59*dt+0.2)))<10
+    assert abs(kf.velocity()[0]-300)<30
+
+def test_smooths_jitter():
+    random.seed(1)
+    kf=KalmanTracker()
+    raw,filt=[],[]
+    for _ in range(90):
+        x=300+random.randint(-8,8)
+        raw.append(abs(x-300))
+        filt.append(abs(center(kf.step((x-20,200,40,40), 1/30))-300))
+    assert sum(filt[30:])<sum(raw[30:])/2
+
+def test_coasts_through_dropouts():
+    kf=KalmanTracker(max_coast=3)
+    for i in range(10): kf.step((100+i*10,200,40,40), 1/30)
+    for _ in range(3): assert kf.step(None, 1/30) is not None
+    assert kf.step(None, 1/30) is None
+
+def test_calculator_keeps_commanding_during_dropout():
+    # the face stays put in the image, so commands must not be counted as camera motion
+    calc=PositionCalculator(640,480,20,motion=KalmanTracker(max_coast=2),px_per_step=0)
+    for _ in range(5): assert calc.command((500,200,40,40), 1/30)=="R100"
+    assert calc.command(None, 1/30)=="R100"
+
+def closed_loop(calc, px_per_step, face, lead, frames=150, fps=30):
+    # face(i) is the face's world position in steps; commands land one frame late
+    sim=Simulator(step_delay=0, verbose=False)
+    pending=None
+    offsets=[]
+    for i in range(frames):
+        off=int((face(i)-sim.pos)*px_per_step)
+        offsets.append(off)
+        if pending: sim.send_command(pending)
+        pending=calc.command((calc.cx+off-20,200,40,40), 1/fps, lead)
+    return offsets
+
+def test_prediction_does_not_chase_own_camera_motion():
+    for pps in (1.0, 2.0):
+        for lead in (0.0, 0.1, 0.3):
+            calc=PositionCalculator(640,480,20,motion=KalmanTracker(),px_per_step=pps)
+            offsets=closed_loop(calc, pps, lambda i: 150, lead)
+            assert max(abs(o) for o in offsets[-30:])<=30
+
+def test_prediction_reduces_lag_on_moving_face():
+    def error(motion, lead):
+        calc=PositionCalculator(640,480,20,motion=motion,px_per_step=2.0)
+        offsets=closed_loop(calc, 2.0, lambda i: 100+2*i, lead)
+        return sum(abs(o) for o in offsets[60:])/len(offsets[60:])
+    assert error(KalmanTracker(), 0.1)<error(None, 0.0)/2
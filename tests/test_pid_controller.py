@@ -0,0 +1,47 @@
+from src.pid_controller import PIDController
+from src.position_calculator import PositionCalculator
+from src.simulator import Simulator
+
+def test_plain_pid_matches_textbook_formula():
+    pid=PIDController(1.0, 0.1, 0.05)
+    assert pid.update(10, 0.1)==10+0.1*1.0+0.05*100
+
+def test_anti_windup_stops_integrating_when_saturated():
+    pid=PIDController(1.0, 1.0, 0.0, out_limit=5)
+    for _ in range(100): assert pid.update(10, 0.1)==5
+    assert pid.integral<=1.0
+    assert pid.update(-1, 0.1)<5
+
+def test_rate_limit_caps_output_slope():
+    pid=PIDController(1.0, 0.0, 0.0, rate_limit=100)
+    assert pid.update(1000, 0.1)==10
+    assert pid.update(1000, 0.1)==20
+
+def test_derivative_filter_smooths_spikes():
+    raw=PIDController(0.0, 0.0, 1.0)
+    filt=PIDController(0.0, 0.0, 1.0, d_alpha=0.2)
+    assert abs(filt.update(10, 0.1))<abs(raw.update(10, 0.1))
+
+def step_response(calc, px_per_step=2.0, target=150, frames=60, fps=30):
+    # the face is fixed in the world; each command is applied one frame late
+    sim=Simulator(step_delay=0, verbose=False)
+    pending=None
+    offsets=[]
+    cmds=0
+    for _ in range(frames):
+        off=int((target-sim.pos)*px_per_step)
+        offsets.append(off)
+        if pending:
+            sim.send_command(pending)
+            cmds+=1
+        pending=calc.command((calc.cx+off-20,200,40,40), 1/fps)
+    return offsets, cmds
+
+def test_pid_settles_where_fixed_steps_oscillate():
+    dz=20
+    offsets,cmds=step_response(PositionCalculator(640,480,dz))
+    assert max(abs(o) for o in offsets[-10:])>dz
+    pid=PIDController(6.0, 0.5, 0.1, out_limit=3000, d_alpha=0.5, rate_limit=30000)
+    pid_offsets,pid_cmds=step_response(PositionCalculator(640,480,dz,pid))
+    assert all(abs(o)<=dz for o in pid_offsets[15:])
+    assert pid_cmds<cmds/4
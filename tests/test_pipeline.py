@@ -0,0 +1,74 @@
+import threading
+import time
+import pytest
+import numpy as np
+from src.pipeline import DropQueue, FramePool, Pipeline
+
+def test_drop_queue_keeps_newest():
+    q=DropQueue(1)
+    for i in range(5): q.put(i)
+    assert q.get(timeout=0)==4
+    assert q.dropped==4
+    assert q.get(timeout=0) is None
+
+def test_pipeline_detects_latest_frame():
+    counter={"n":0}
+    seen=[]
+    acted=threading.Event()
+    def read():
+        counter["n"]+=1
+        time.sleep(0.001)
+        return counter["n"]
+    def detect(frame):
+        time.sleep(0.02)
+        return [frame]
+    def actuate(faces, ts):
+        seen.append(faces[0])
+        if len(seen)>=3: acted.set()
+    p=Pipeline(read, detect, actuate)
+    p.start()
+    assert acted.wait(2)
+    p.stop()
+    assert seen==sorted(seen)
+    assert seen[-1]-seen[0]>len(seen)
+    assert p.frames.dropped>0
+    assert p.report()["detect"]["count"]>=3
+
+def test_pipeline_surfaces_stage_errors():
+    def read(): raise RuntimeError("boom")
+    p=Pipeline(read, lambda f:[], lambda faces, ts:None)
+    p.start()
+    time.sleep(0.05)
+    assert not p.running()
+    p.stop()
+    with pytest.raises(RuntimeError): p.check()
+
+def test_pooled_pipeline_never_overwrites_frames_in_use():
+    counter={"n":0}
+    corrupted=[]
+    published=[]
+    def read(out=None):
+        counter["n"]+=1
+        if out is None: out=np.empty(4, dtype=np.int64)
+        out[:]=counter["n"]
+        return out
+    def detect(frame):
+        n=frame[0]
+        time.sleep(0.01)
+        if (frame!=n).any(): corrupted.append(n)
+        return [n]
+    p=Pipeline(read, detect, lambda faces, ts:None, pool=FramePool())
+    p.start()
+    deadline=time.monotonic()+1
+    while len(published)<20 and time.monotonic()<deadline:
+        item=p.display.get(timeout=0.1)
+        if item is None: continue
+        frame,faces=item
+        time.sleep(0.005)
+        assert (frame==faces[0]).all()
+        published.append(faces[0])
+        p.release(frame)
+    p.stop()
+    assert len(published)==20 and not corrupted
+    # buffers are recycled: far fewer allocations than frames captured
+    assert p.pool.misses<10<counter["n"]
@@ -0,0 +1,108 @@
+import threading
+import sys
+import time
+import types
+import pytest
+from src.constants import ACK_BAD_CHECKSUM
+from src.protocol import PACKET_SIZE, decode, encode, encode_ack, parse_command
+from src.serial_comm import SerialComm
+from src.simulator import Simulator
+from src.transport import AsyncTransport, coalesce
+from src.position_calculator import PositionCalculator
+
+def test_roundtrip_two_axis_packet():
+    pkt=encode("M-120,45,800", 7)
+    assert len(pkt)==PACKET_SIZE
+    assert decode(pkt)==(7,-120,45,800)
+
+def test_text_commands_map_to_packets():
+    assert decode(encode("L050", 1))==(1,-50,0,500)
+    assert decode(encode("S", 2))==(2,0,0,0)
+    assert parse_command("R007")==(7,0,0)
+
+def test_bad_checksum_rejected():
+    pkt=bytearray(encode("M1,2,3", 0))
+    pkt[3]^=0xFF
+    with pytest.raises(ValueError): decode(bytes(pkt))
+
+def test_coalesce_two_axis():
+    assert coalesce(["M10,5,0","M-4,5,0","R002"])==["M8,10,0"]
+
+def test_pan_tilt_command_moves_both_axes():
+    calc=PositionCalculator(640,480,20,tilt=True)
+    cmd=calc.command((400,300,40,40))
+    assert cmd=="M50,40,0"
+    sim=Simulator(step_delay=0, verbose=False)
+    sim.send_command(cmd)
+    assert (sim.pos,sim.tilt)==(50,40)
+
+class FakeSerial:
+    # answers each packet the way the sketch does
+    is_open=True
+    def __init__(self, boot=b"READY\r\n"):
+        self.rx=bytearray(boot)
+        self.timeout=1.0
+    def write(self, data):
+        try:
+            seq,*_=decode(data)
+            self.rx+=encode_ack(seq)
+        except ValueError: self.rx+=encode_ack(data[1], ACK_BAD_CHECKSUM)
+    def read(self, n):
+        if not self.rx: time.sleep(0.001)
+        out,self.rx=bytes(self.rx[:n]),self.rx[n:]
+        return out
+    def close(self): self.is_open=False
+    def readline(self):
+        i=self.rx.find(b"\n")
+        if i<0: time.sleep(self.timeout)
+        return self.read(i+1 if i>=0 else len(self.rx))
+
+def test_serial_comm_binary_acks():
+    comm=SerialComm("fake", protocol="binary")
+    comm.ser=FakeSerial()
+    assert comm.send_command("M10,-10,0")=="OK"
+    assert comm.send_command("L005")=="OK"
+    assert comm.seq==2
+
+def test_connect_waits_for_ready_not_a_fixed_delay(monkeypatch):
+    port=FakeSerial(b"\xff\x00boot\r\nREADY\r\n")
+    monkeypatch.setitem(sys.modules, "serial", types.SimpleNamespace(Serial=lambda *a, **kw: port))
+    comm=SerialComm("fake")
+    t=time.monotonic()
+    comm.connect()
+    assert time.monotonic()-t<0.5
+    assert port.timeout==comm.to
+
+def test_connect_gives_up_after_ready_timeout(monkeypatch):
+    port=FakeSerial(b"")
+    monkeypatch.setitem(sys.modules, "serial", types.SimpleNamespace(Serial=lambda *a, **kw: port))
+    comm=SerialComm("fake", ready_timeout=0.2)
+    t=time.monotonic()
+    comm.connect()
+    assert 0.2<=time.monotonic()-t<0.5
+
+class FlakySerial(FakeSerial):
+    # corrupts the first packet on the wire and sends a stale ack before the second's
+    def __init__(self):
+        super().__init__(b"")
+        self.packets=0
+    def write(self, data):
+        self.packets+=1
+        if self.packets==1: data=data[:-1]+bytes([data[-1]^0xFF])
+        if self.packets==2: self.rx+=encode_ack(200)
+        super().write(data)
+
+def test_async_binary_matches_acks_by_seq():
+    comm=SerialComm("fake", protocol="binary")
+    comm.ser=FlakySerial()
+    transport=AsyncTransport(comm, window=1, ack_timeout=1.0, coalescing=None)
+    transport.running=True
+    transport.threads=[threading.Thread(target=fn, daemon=True) for fn in (transport._writer, transport._reader)]
+    for th in transport.threads: th.start()
+    t=time.monotonic()
+    transport.send_command("M10,0,0")
+    transport.send_command("M0,10,0")
+    assert transport.wait_idle(2.0)
+    assert time.monotonic()-t<0.5
+    transport.close()
+    assert (transport.stats["errors"],transport.stats["acked"],transport.stats["timeouts"])==(1,1,0)
@@ -0,0 +1,72 @@
+import time
+import numpy as np
+from src.recorder import AsyncRecorder
+
+class FakeWriter:
+    def __init__(self, fname, delay=0.0):
+        self.fname=fname
+        self.delay=delay
+        self.frames=[]
+        self.released=False
+    def write(self, frame):
+        time.sleep(self.delay)
+        self.frames.append(int(frame[0,0,0]))
+    def release(self): self.released=True
+
+def make(tmp_path, delay=0.0, **kw):
+    writers=[]
+    def factory(fname):
+        writers.append(FakeWriter(fname, delay))
+        return writers[-1]
+    rec=AsyncRecorder(str(tmp_path/"rec.avi"), fps=10, writer_factory=factory, **kw)
+    rec.start()
+    return rec,writers
+
+def frame(i): return np.full((4,4,3), i, dtype=np.uint8)
+
+def test_drops_oldest_under_backpressure(tmp_path):
+    rec,writers=make(tmp_path, delay=0.02, buffer=4)
+    t=time.monotonic()
+    for i in range(50): rec.write(frame(i))
+    assert time.monotonic()-t<0.1
+    rec.release()
+    assert rec.dropped>0
+    assert rec.written+rec.dropped==50
+    assert writers[0].frames[-1]==49
+
+def test_rotates_segments_by_time(tmp_path):
+    rec,writers=make(tmp_path, segment_seconds=0.05)
+    for i in range(6):
+        rec.write(frame(i))
+        time.sleep(0.03)
+    rec.release()
+    assert len(writers)>=2
+    assert all(w.released for w in writers)
+    assert sum(len(w.frames) for w in writers)==6
+
+def test_event_mode_writes_preroll_and_postroll(tmp_path):
+    rec,writers=make(tmp_path, event=True, preroll=0.3, postroll=0.0)
+    for i in range(10): rec.write(frame(i), face=False)
+    rec.write(frame(10), face=True)
+    time.sleep(0.01)
+    for i in range(11,15): rec.write(frame(i), face=False)
+    rec.release()
+    assert len(writers)==1
+    assert writers[0].frames==[7,8,9,10]
+
+class FileWriter(FakeWriter):
+    # appends 100 bytes per frame, so the segment grows on disk like a real one
+    def write(self, frame):
+        super().write(frame)
+        with open(self.fname, "ab") as f: f.write(bytes(100))
+
+def test_rotates_segments_by_size_at_fractional_fps(tmp_path):
+    writers=[]
+    def factory(fname):
+        writers.append(FileWriter(fname))
+        return writers[-1]
+    rec=AsyncRecorder(str(tmp_path/"rec.avi"), fps=29.97, segment_bytes=1000, buffer=200, writer_factory=factory)
+    rec.start()
+    for i in range(120): rec.write(frame(i))
+    rec.release()
+    assert [len(w.frames) for w in writers]==[29,29,29,29,4]
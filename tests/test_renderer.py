@@ -0,0 +1,17 @@
+import numpy as np
+from src.renderer import Renderer
+
+def test_renderer_keeps_every_nth_frame():
+    r=Renderer(every=3, max_fps=None)
+    frame=np.zeros((4,4,3), dtype=np.uint8)
+    for _ in range(9): r.submit(frame, [])
+    assert r.stats["queued"]==3
+    assert r.slot.dropped==2
+
+def test_renderer_rate_limits_and_copies():
+    r=Renderer(every=1, max_fps=1)
+    frame=np.zeros((4,4,3), dtype=np.uint8)
+    for _ in range(5): r.submit(frame, [])
+    assert r.stats["queued"]==1
+    queued,_=r.slot.get(timeout=0)
+    assert queued is not frame
@@ -0,0 +1,39 @@
+import numpy as np
+from src.roi_tracker import DetectTrackDetector, TemplateTracker
+
+def face_frame(x, y):
+    frame=np.zeros((240,320,3), dtype=np.uint8)
+    rng=np.random.default_rng(0)
+    frame[y:y+40,x:x+40]=rng.integers(0,255,(40,40,3), dtype=np.uint8)
+    return frame
+
+class FakeDetector:
+    def __init__(self): self.calls=0
+    def detect(self, frame):
+        self.calls+=1
+        ys,xs=np.nonzero(frame[:,:,0])
+        return [(int(xs.min()), int(ys.min()), 40, 40)]
+    def close(self): pass
+
+def test_template_tracker_follows_shift():
+    t=TemplateTracker()
+    t.init(face_frame(100,100), (100,100,40,40))
+    bbox,score=t.update(face_frame(108,95))
+    assert bbox==(108,95,40,40)
+    assert score>0.9
+
+def test_detect_track_skips_detector():
+    det=FakeDetector()
+    dt=DetectTrackDetector(det, interval=5)
+    for i in range(10):
+        faces=dt.detect(face_frame(100+i*2,100))
+        assert faces[0][:2]==(100+i*2,100)
+    assert det.calls==2
+    assert dt.stats["tracked"]==8
+
+def test_detect_track_redetects_on_low_confidence():
+    det=FakeDetector()
+    dt=DetectTrackDetector(det, interval=10, threshold=0.6)
+    dt.detect(face_frame(100,100))
+    dt.detect(np.zeros((240,320,3), dtype=np.uint8)+np.eye(240,320,dtype=np.uint8)[:,:,None])
+    assert det.calls==2
@@ -0,0 +1,36 @@
+import pytest
+from src.target_selector import FaceAssociator, TargetSelector, iou
+
+def test_iou():
+    assert iou((0,0,10,10),(0,0,10,10))==1.0
+    assert iou((0,0,10,10),(20,20,10,10))==0.0
+    assert iou((0,0,10,10),(5,0,10,10))==pytest.approx(50/150)
+
+def test_associator_keeps_ids_when_order_changes():
+    a=FaceAssociator()
+    first=a.update([(100,100,50,50,0.9),(400,100,50,50,0.8)])
+    ids={t.bbox[0]:t.id for t in first}
+    second=a.update([(405,102,50,50,0.8),(103,101,50,50,0.9)])
+    assert {t.bbox[0]:t.id for t in second}=={405:ids[400],103:ids[100]}
+
+def test_sticky_ignores_bigger_newcomer():
+    s=TargetSelector(640,480,"sticky")
+    assert s.select([(300,200,40,40,0.9)]).bbox==(300,200,40,40)
+    for dx in range(5):
+        dets=[(500,100,120,120,0.99),(300+dx,200,40,40,0.9)]
+        assert s.select(dets).bbox==(300+dx,200,40,40)
+    assert s.switches==0
+
+def test_largest_switches_only_past_margin():
+    s=TargetSelector(640,480,"largest",switch_margin=1.5)
+    s.select([(100,100,50,50,0.9),(400,100,55,55,0.9)])
+    t=s.select([(100,100,50,50,0.9),(400,100,55,55,0.9)])
+    assert t.bbox==(400,100,55,55)
+    assert s.select([(100,100,60,60,0.9),(400,100,55,55,0.9)]).bbox==(400,100,55,55)
+    assert s.select([(100,100,80,80,0.9),(400,100,55,55,0.9)]).bbox==(100,100,80,80)
+    assert s.switches==1
+
+def test_falls_back_when_target_leaves():
+    s=TargetSelector(640,480,"sticky",max_misses=0)
+    s.select([(300,200,40,40,0.9),(10,10,40,40,0.9)])
+    assert s.select([(10,10,40,40,0.9)]).bbox==(10,10,40,40)
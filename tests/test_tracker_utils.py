@@ -5,3 +5,11 @@ def test_calculate_center():
 
 def test_calculate_offset():
     assert calculate_offset((100,100),(50,50))==50
+
+def test_expand_bbox_clips_to_frame():
+    assert expand_bbox((10,10,20,20),0.5,640,480)==(0,0,40,40)
+    assert expand_bbox((600,440,40,40),0.5,640,480)==(580,420,640,480)
+
+def test_to_pixels_maps_crop_to_frame():
+    assert to_pixels((0.25,0.5,0.5,0.25),100,200,200,100)==(150,250,100,25)
+    assert to_pixels((0.5,0.5,0.25,0.25),0,0,640,480)==(320,240,160,120)
@@ -0,0 +1,94 @@
+import time
+from src.metrics import metrics
+from src.simulator import Simulator, TrapezoidAxis
+from src.transport import AsyncTransport, StreamTransport, coalesce, latest
+
+def test_coalesce_nets_moves():
+    assert coalesce(["R050","L020","R010"])==["R040"]
+    assert coalesce(["R050","L050"])==[]
+    assert coalesce(["L100","S","R005"])==["S","R005"]
+    assert latest(["R050","L020","S"])==["S"]
+
+def test_sync_simulator_blocks_for_move():
+    sim=Simulator(step_delay=0.001, verbose=False)
+    t=time.monotonic()
+    assert sim.send_command("R100")=="OK"
+    assert time.monotonic()-t>=0.1
+    assert sim.pos==100
+
+def test_async_transport_never_waits_and_coalesces():
+    sim=Simulator(step_delay=0.001, verbose=False)
+    tr=AsyncTransport(sim)
+    tr.connect()
+    t=time.monotonic()
+    for cmd in ["R100","R050","L030","R020"]: tr.send_command(cmd)
+    assert time.monotonic()-t<0.05
+    assert tr.wait_idle(2)
+    tr.close()
+    assert sim.pos==140
+    assert tr.stats["coalesced"]>0
+    assert tr.stats["acked"]==tr.stats["sent"]
+
+def test_async_transport_reports_round_trips():
+    metrics.reset()
+    tr=AsyncTransport(Simulator(step_delay=0.001, verbose=False), coalescing=None)
+    tr.connect()
+    for cmd in ["R010","L010","R005"]: tr.send_command(cmd)
+    assert tr.wait_idle(2)
+    tr.close()
+    snap=metrics.snapshot()
+    assert snap["timings"]["serial_rtt"]["count"]==3
+    assert snap["gauges"]=={"serial_queue":0, "serial_inflight":0, "serial_timeouts":0}
+    metrics.reset()
+
+class FakeClock:
+    def __init__(self): self.t=0.0
+    def __call__(self): return self.t
+
+def test_stream_acks_at_once_and_retargets_mid_move():
+    clock=FakeClock()
+    sim=Simulator(verbose=False, clock=clock)
+    tr=StreamTransport(sim)
+    assert tr.send_command("R500")=="OK"
+    assert sim.pos==0
+    clock.t=0.1
+    mid=sim.pos
+    v=sim.axes[0].v
+    assert 0<mid<500
+    tr.send_command("R500")
+    assert sim.axes[0].target==mid+500
+    clock.t=0.101
+    assert sim.axes[0].v>=v
+    clock.t=2.0
+    assert sim.pos==mid+500
+
+def test_stream_slew_beats_blocking_steps():
+    clock=FakeClock()
+    sim=Simulator(verbose=False, clock=clock, max_speed=2000, accel=8000)
+    StreamTransport(sim).send_command("R999")
+    clock.t=0.8
+    # the blocking sketch needs 999*2 ms for the same move
+    assert sim.pos==999
+
+def test_stream_halt_stops_without_reversing():
+    clock=FakeClock()
+    sim=Simulator(verbose=False, clock=clock)
+    tr=StreamTransport(sim)
+    tr.send_command("R999")
+    clock.t=0.2
+    tr.send_command("S")
+    at_halt=sim.pos
+    clock.t=1.0
+    assert at_halt<sim.pos<999
+    assert sim.axes[0].v==0
+
+def test_axis_steps_no_faster_than_the_sketch_loop():
+    axis=TrapezoidAxis(max_speed=2000, accel=8000, step_rate=500)
+    axis.set_target(1000)
+    path=[0.0]
+    for _ in range(300):
+        axis.advance(0.01)
+        path.append(axis.pos)
+    assert max(b-a for a,b in zip(path, path[1:]))<=500*0.01+1e-6
+    assert max(path)<1000.5
+    assert (axis.pos,axis.v)==(1000,0.0)